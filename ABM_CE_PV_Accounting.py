@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - model-wide quantities of material recovery
+"""
+
+
+class RecoveryAccounting:
+    """
+    Model-wide quantities read when producers recover materials (see
+    MaterialFlows.update_recovered_volumes). They are the same for all
+    producers and are computed once per step by the model (see
+    ABM_CE_PV.recover_materials) instead of once per agent. Sums are
+    accumulated in the order of agents' unique_id, as when each agent
+    computed them.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        total_recycling_volume (sum over recyclers and producers of their
+            recycling volume and the installer recycled amount)
+
+    """
+
+    def __init__(self, model):
+        """
+        Creation of the accounting
+        """
+        self.model = model
+        self.total_recycling_volume = 0
+
+    def update_recycled_volumes(self):
+        """
+        Compute the volume recycled by installers (waste recycled by
+        consumers but not through recyclers) and the total recycling volume.
+        """
+        model = self.model
+        tot_recycled = 0
+        amount_recyclers = 0
+        for agent in model.consumers:
+            tot_recycled += agent.yearly_recycled_waste
+        for agent in model.recyclers:
+            amount_recyclers += agent.recycling_volume
+        model.installer_recycled_amount = \
+            (tot_recycled - amount_recyclers) / model.num_prod_n_recyc
+        self.total_recycling_volume = 0
+        for agent in model.recyclers + model.producers:
+            self.total_recycling_volume += agent.recycling_volume + \
+                model.installer_recycled_amount
@@ -0,0 +1,184 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - bulk drawing of agents' random attributes
+"""
+
+from ABM_CE_PV_ProducerAgents import Producers
+import numpy as np
+from scipy.stats import truncnorm
+
+
+class AgentFactory:
+    """
+    Draw the random attributes of all agents of a type at once with vectorized
+    calls instead of one scalar draw (or one truncated normal distribution
+    object) per agent. Each agent type draws from its own random stream
+    spawned from the seed, so that for a given seed attributes are the same
+    from run to run and do not depend on the number of agents of the other
+    types. Each method returns one dictionary of attributes per agent, in the
+    order of agents' unique_id, that is passed to the agents' constructor
+    (see e.g. Consumers.draw_attributes for the same attributes drawn one
+    agent at a time).
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        seed (to fix random numbers), (default=None). Modeler's choice.
+
+    """
+
+    agent_types = ["consumers", "recyclers", "producers", "refurbishers"]
+
+    def __init__(self, model, seed=None):
+        """
+        Creation of the agent factory
+        """
+        self.model = model
+        self.rngs = dict(zip(self.agent_types, [
+            np.random.default_rng(x) for x in
+            np.random.SeedSequence(seed).spawn(len(self.agent_types))]))
+
+    @staticmethod
+    def triangular(rng, distribution, size):
+        """
+        Draw from a triangular distribution given as [min, max, mode].
+        """
+        return rng.triangular(distribution[0], distribution[2],
+                              distribution[1], size)
+
+    @staticmethod
+    def truncated_normal(rng, lower, upper, loc, scale, size):
+        """
+        Draw from a normal distribution bounded by lower and upper.
+        """
+        return truncnorm.rvs((lower - loc) / scale, (upper - loc) / scale,
+                             loc, scale, size=size, random_state=rng)
+
+    @staticmethod
+    def to_agents(attributes):
+        """
+        Split arrays of attributes into one dictionary per agent.
+        """
+        columns = {key: value.tolist() if isinstance(value, np.ndarray) else
+                   value for key, value in attributes.items()}
+        return [dict(zip(columns, values)) for values in
+                zip(*columns.values())]
+
+    def consumers(self, failure_rate_alpha, landfill_cost, hoarding_cost,
+                  used_product_substitution_rate, att_distrib_param_eol,
+                  att_distrib_param_reuse, max_storage):
+        """
+        Draw consumers' random attributes.
+        """
+        model = self.model
+        rng = self.rngs["consumers"]
+        n = model.num_consumers
+        attributes = {}
+        attributes["max_storage"] = self.triangular(rng, max_storage, n)
+        attributes["used_product_substitution_rate"] = self.triangular(
+            rng, used_product_substitution_rate, n)
+        attributes["failure_rate_alpha"] = self.triangular(
+            rng, failure_rate_alpha, n)
+        attributes["recycling_facility_id"] = model.num_consumers + \
+            rng.integers(model.num_recyclers, size=n)
+        attributes["refurbisher_id"] = model.num_consumers + \
+            model.num_prod_n_recyc + \
+            rng.integers(model.num_refurbishers, size=n)
+        attributes["landfill_cost"] = rng.choice(np.asarray(landfill_cost),
+                                                 size=n)
+        attributes["hoarding_cost"] = self.triangular(
+            rng, hoarding_cost, n) * attributes["max_storage"]
+        attributes["attitude_level"] = self.truncated_normal(
+            rng, 0, 1, att_distrib_param_eol[0], att_distrib_param_eol[1], n)
+        attributes["attitude_level_reuse"] = self.truncated_normal(
+            rng, 0, 1, att_distrib_param_reuse[0], att_distrib_param_reuse[1],
+            n)
+        # Distances from every state to each consumer's (random) state
+        states = np.array([model.state_index[x] for x in model.all_states])
+        distances_to_customers = model.state_distances[
+            :, states[rng.integers(len(states), size=n)]]
+        distances_to_customers = np.where(
+            distances_to_customers == 0, model.mean_distance_within_state,
+            distances_to_customers)
+        attributes["random_interstate_distance"] = distances_to_customers[
+            rng.integers(distances_to_customers.shape[0], size=n),
+            np.arange(n)]
+        attributes["distances_to_customers"] = \
+            distances_to_customers.T.tolist()
+        # A small constant is added to avoid np.random.triangular error
+        attributes["recycler_distance"] = rng.triangular(
+            model.mn_mx_av_distance_to_recycler[0],
+            model.mn_mx_av_distance_to_recycler[2],
+            model.mn_mx_av_distance_to_recycler[1] + 0.001, n)
+        attributes["knowledge_level"] = self.truncated_normal(
+            rng, 0, 1, model.extended_tpb["knowledge_distrib"][0],
+            model.extended_tpb["knowledge_distrib"][1], n)
+        return self.to_agents(attributes)
+
+    def recyclers(self, original_recycling_cost,
+                  social_influencability_boundaries):
+        """
+        Draw recyclers' random attributes.
+        """
+        rng = self.rngs["recyclers"]
+        n = self.model.num_recyclers
+        attributes = {}
+        attributes["original_recycling_cost"] = self.triangular(
+            rng, original_recycling_cost, n)
+        attributes["social_influencability"] = rng.uniform(
+            social_influencability_boundaries[0],
+            social_influencability_boundaries[1], n)
+        attributes["knowledge"] = rng.random(n)
+        attributes["social_interactions"] = rng.random(n)
+        attributes["knowledge_learning"] = rng.random(n)
+        return self.to_agents(attributes)
+
+    def producers(self, scd_mat_prices, virgin_mat_prices,
+                  social_influencability_boundaries,
+                  self_confidence_boundaries):
+        """
+        Draw producers' random attributes.
+        """
+        model = self.model
+        rng = self.rngs["producers"]
+        n = model.num_producers
+        first_id = model.num_consumers + model.num_recyclers
+        materials = [Producers.material_type(model, first_id + i)
+                     for i in range(n)]
+        attributes = {}
+        attributes["social_influencability"] = rng.uniform(
+            social_influencability_boundaries[0],
+            social_influencability_boundaries[1], n)
+        attributes["knowledge"] = rng.random(n)
+        attributes["social_interactions"] = rng.random(n)
+        attributes["knowledge_learning"] = rng.random(n)
+        attributes["self_confidence"] = rng.uniform(
+            self_confidence_boundaries[0], self_confidence_boundaries[1], n)
+        for name, prices in [("recycled_mat_price", scd_mat_prices),
+                             ("virgin_mat_prices", virgin_mat_prices)]:
+            # Materials without prices (e.g. "Product") have nan prices
+            prices = np.array([prices[x] for x in materials], dtype=float)
+            priced = ~np.isnan(prices).any(axis=1)
+            attributes[name] = np.full(n, np.nan)
+            attributes[name][priced] = self.triangular(
+                rng, prices[priced].T, priced.sum())
+        return self.to_agents(attributes)
+
+    def refurbishers(self, original_repairing_cost, scndhand_mkt_pric_rate,
+                     refurbisher_margin, max_storage):
+        """
+        Draw refurbishers' random attributes.
+        """
+        rng = self.rngs["refurbishers"]
+        n = self.model.num_refurbishers
+        attributes = {}
+        attributes["original_repairing_cost"] = self.triangular(
+            rng, original_repairing_cost, n)
+        attributes["scndhand_mkt_pric_rate"] = self.truncated_normal(
+            rng, 0.11, 1.14, scndhand_mkt_pric_rate[0],
+            scndhand_mkt_pric_rate[1], n)
+        attributes["refurbisher_margin"] = self.triangular(
+            rng, refurbisher_margin, n)
+        attributes["max_storage_ref"] = self.triangular(rng, max_storage, n)
+        return self.to_agents(attributes)
@@ -0,0 +1,150 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - population totals shared by agents
+"""
+
+import numpy as np
+
+
+class ConsumerAggregates:
+    """
+    Population totals read by consumers when they make their end of life (EoL)
+    decision (see Consumers.repairable_modules and Consumers.tpb_decision).
+    Totals are computed once at the beginning of each step by the model. If
+    sequential, consumers then update their contribution to the totals as
+    they step so that each consumer sees the changes made by the consumers
+    stepped before it. Otherwise, all consumers see the totals of the
+    beginning of the step. Sequential updates take constant time: each
+    change is added to the totals with a compensated (Neumaier) sum, so that
+    totals do not drift from sums over consumers as changes accumulate, and
+    the volume sold is exactly 0 when no consumer sells.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        sequential (boolean), (default=True). Modeler's choice.
+        number_product_EoL (array of consumers' number_product_EoL)
+        sold (array of booleans, True for consumers whose EoL pathway is
+            "sell")
+        installed_capacity (array of the last element of consumers'
+            number_product)
+        num_sellers (number of consumers whose EoL pathway is "sell")
+        sums (dictionary of totals' names and their running sum and
+            compensation)
+        total_waste (sum of consumers' number_product_EoL)
+        sold_waste (sum of number_product_EoL of consumers whose EoL pathway
+            is "sell")
+        new_installed_capacity (sum of the last element of consumers'
+            number_product)
+        total_volume_refurbished (sum of refurbishers' refurbished_volume)
+
+    """
+
+    def __init__(self, model, sequential=True):
+        """
+        Creation of the population totals
+        """
+        self.model = model
+        self.sequential = sequential
+        self.number_product_EoL = np.zeros(model.num_consumers)
+        self.sold = np.zeros(model.num_consumers, dtype=bool)
+        self.installed_capacity = np.zeros(model.num_consumers)
+        self.num_sellers = 0
+        self.sums = {}
+        self.total_waste = 0
+        self.sold_waste = 0
+        self.new_installed_capacity = 0
+        self.total_volume_refurbished = 0
+
+    @staticmethod
+    def sequential_sum(terms):
+        """
+        Add terms one after the other (cumulative sum, in the same order as a
+        loop over the terms).
+        """
+        return np.cumsum(terms)[-1] if len(terms) else 0
+
+    def reset(self):
+        """
+        Compute totals from the current state of agents.
+        """
+        model = self.model
+        self.total_volume_refurbished = 0
+        if model.engine == "vectorized":
+            store = model.consumer_store
+            sold = store.EoL_pathway == store.eol_choices.index("sell")
+            self.total_waste = store.number_product_EoL.sum()
+            self.sold_waste = store.number_product_EoL[sold].sum()
+            self.new_installed_capacity = \
+                store.number_product[:, store.num_cohorts - 1].sum()
+        else:
+            for agent in model.consumers:
+                self.number_product_EoL[agent.unique_id] = \
+                    agent.number_product_EoL
+                self.sold[agent.unique_id] = agent.EoL_pathway == "sell"
+                self.installed_capacity[agent.unique_id] = \
+                    agent.number_product[-1]
+            self.num_sellers = int(self.sold.sum())
+            self.set_total("total_waste",
+                           self.sequential_sum(self.number_product_EoL))
+            self.set_total("sold_waste", self.sequential_sum(
+                np.where(self.sold, self.number_product_EoL, 0)))
+            self.set_total("new_installed_capacity",
+                           self.sequential_sum(self.installed_capacity))
+        for agent in model.refurbishers:
+            self.total_volume_refurbished += agent.refurbished_volume
+
+    def set_total(self, name, value):
+        """
+        Set a total, without compensation.
+        """
+        self.sums[name] = [value, 0.0]
+        setattr(self, name, value)
+
+    def add(self, name, value):
+        """
+        Add value to a total with a compensated (Neumaier) sum, the rounding
+        errors of past additions being kept in the total's compensation.
+        """
+        total_sum = self.sums[name]
+        new_sum = total_sum[0] + value
+        if abs(total_sum[0]) >= abs(value):
+            total_sum[1] += (total_sum[0] - new_sum) + value
+        else:
+            total_sum[1] += (value - new_sum) + total_sum[0]
+        total_sum[0] = new_sum
+        setattr(self, name, new_sum + total_sum[1])
+
+    def add_product_stock(self, consumer):
+        """
+        Update a consumer's contribution to product and waste totals after it
+        updated its product stock.
+        """
+        if self.sequential:
+            i = consumer.unique_id
+            self.add("total_waste", -self.number_product_EoL[i])
+            self.add("total_waste", consumer.number_product_EoL)
+            self.add("new_installed_capacity", -self.installed_capacity[i])
+            self.add("new_installed_capacity", consumer.number_product[-1])
+            if self.sold[i]:
+                self.add("sold_waste", -self.number_product_EoL[i])
+                self.add("sold_waste", consumer.number_product_EoL)
+            self.number_product_EoL[i] = consumer.number_product_EoL
+            self.installed_capacity[i] = consumer.number_product[-1]
+
+    def change_pathway(self, consumer, past_pathway):
+        """
+        Update the volume sold when a consumer changes EoL pathway.
+        """
+        if self.sequential and past_pathway != consumer.EoL_pathway:
+            i = consumer.unique_id
+            self.sold[i] = consumer.EoL_pathway == "sell"
+            if past_pathway == "sell":
+                self.num_sellers -= 1
+                self.add("sold_waste", -self.number_product_EoL[i])
+            elif consumer.EoL_pathway == "sell":
+                self.num_sellers += 1
+                self.add("sold_waste", self.number_product_EoL[i])
+            if self.num_sellers == 0:
+                self.set_total("sold_waste", 0)
@@ -9,11 +9,77 @@ Run - batch of simulations with final state of outputs
 
 from ABM_CE_PV_Model import *
 from mesa.batchrunner import BatchRunner
-from mesa.batchrunner import BatchRunnerMP
 from SALib.sample import saltelli
+from ABM_CE_PV_CampaignRunner import CampaignRunner
+from ABM_CE_PV_CampaignStore import CampaignStore
+from ABM_CE_PV_RunCache import RunCache
 from copy import deepcopy
+from functools import partial
+import hashlib
 import time
 
+
+def sobol_jobs(X, list_variables, all_fixed_params, all_states):
+    """
+    Return the model's parameters of each line of the Sobol matrix X and the
+    jobs ((line, seed) and model's parameters) of the campaign. Recycling
+    states added with the number of recyclers are drawn with a generator
+    seeded by that number, so that jobs are the same each time the campaign
+    is launched and lines with the same number of recyclers have the same
+    recycling states (and are only simulated once, see RunCache).
+    """
+    row_params = []
+    jobs = []
+    for i in range(X.shape[0]):
+        fixed_params = deepcopy(all_fixed_params)
+        for j in range(X.shape[1]):
+            value_to_change = X[i][j]
+            variable_to_change = list_variables[j]
+            if j < 1:
+                for key in fixed_params[variable_to_change].keys():
+                    fixed_params[variable_to_change][key] += (
+                            1 - fixed_params[variable_to_change][key]) * \
+                                                             value_to_change
+            elif j < 2:
+                fixed_params[variable_to_change] = int(value_to_change)
+                states_random = random.Random(int(value_to_change))
+                num_states_to_add = int(value_to_change / 2) - \
+                    len(fixed_params['recycling_states'])
+                for count_new_states in range(num_states_to_add):
+                    choice_states = [
+                        x for x in all_states
+                        if x not in fixed_params['recycling_states']]
+                    fixed_params['recycling_states'].append(
+                        states_random.choice(choice_states))
+            elif j < 4:
+                fixed_params[variable_to_change] = [
+                    x * value_to_change for x in
+                    fixed_params[variable_to_change]]
+            elif j < 5:
+                fixed_params[variable_to_change][0] = value_to_change
+            else:
+                fixed_params[variable_to_change] = -1 * value_to_change
+        fixed_params.pop("seed")
+        row_params.append(fixed_params)
+        for seed in range(0, 6):
+            kwargs = deepcopy(fixed_params)
+            kwargs["seed"] = seed
+            jobs.append(((i, seed), kwargs))
+    return row_params, jobs
+
+
+def campaign_id(jobs, run_cache, max_steps, model_reporters):
+    """
+    Return the identifier of a campaign: the hash of the keys of all its
+    jobs (model's parameters, number of steps, reporters and model's code
+    version, see RunCache.key), so that results of a campaign with other
+    definitions are not read.
+    """
+    return hashlib.sha256(repr(
+        [(key, run_cache.key(kwargs, max_steps, model_reporters)) for
+         key, kwargs in jobs]).encode()).hexdigest()
+
+
 # Batch run model
 if __name__ == '__main__':
     t0 = time.time()
@@ -280,135 +346,156 @@ if __name__ == '__main__':
             if upper_bound[x] != bounds[1]:
                 upper_bound[x] = bounds[1]
                 X = np.vstack((X, upper_bound))
+        model_reporters = {
+            "Year": partial(ABM_CE_PV.report_output, condition="year"),
+            "Agents repairing":
+                partial(ABM_CE_PV.count_EoL, condition="repairing"),
+            "Agents selling":
+                partial(ABM_CE_PV.count_EoL, condition="selling"),
+            "Agents recycling":
+                partial(ABM_CE_PV.count_EoL, condition="recycling"),
+            "Agents landfilling":
+                partial(ABM_CE_PV.count_EoL, condition="landfilling"),
+            "Agents storing":
+                partial(ABM_CE_PV.count_EoL, condition="hoarding"),
+            "Agents buying new":
+                partial(ABM_CE_PV.count_EoL, condition="buy_new"),
+            "Agents buying used":
+                partial(ABM_CE_PV.count_EoL, condition="buy_used"),
+            "Agents buying certified":
+                partial(ABM_CE_PV.count_EoL, condition="certified"),
+            "Total product":
+                partial(ABM_CE_PV.report_output, condition="product_stock"),
+            "New product":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_stock_new"),
+            "Used product":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_stock_used"),
+            "New product_mass":
+                partial(ABM_CE_PV.report_output,
+                        condition="prod_stock_new_mass"),
+            "Used product_mass":
+                partial(ABM_CE_PV.report_output,
+                        condition="prod_stock_used_mass"),
+            "End-of-life - repaired":
+                partial(ABM_CE_PV.report_output, condition="product_repaired"),
+            "End-of-life - sold":
+                partial(ABM_CE_PV.report_output, condition="product_sold"),
+            "End-of-life - recycled":
+                partial(ABM_CE_PV.report_output, condition="product_recycled"),
+            "End-of-life - landfilled":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_landfilled"),
+            "End-of-life - stored":
+                partial(ABM_CE_PV.report_output, condition="product_hoarded"),
+            "eol - new repaired weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_repaired"),
+            "eol - new sold weight":
+                partial(ABM_CE_PV.report_output, condition="product_new_sold"),
+            "eol - new recycled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_recycled"),
+            "eol - new landfilled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_landfilled"),
+            "eol - new stored weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_hoarded"),
+            "eol - used repaired weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_repaired"),
+            "eol - used sold weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_sold"),
+            "eol - used recycled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_recycled"),
+            "eol - used landfilled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_landfilled"),
+            "eol - used stored weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_hoarded"),
+            "Average landfilling cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_landfill_cost"),
+            "Average storing cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_hoarding_cost"),
+            "Average recycling cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_recycling_cost"),
+            "Average repairing cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_repairing_cost"),
+            "Average selling cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_second_hand_price"),
+            "Recycled material volume":
+                partial(ABM_CE_PV.report_output,
+                        condition="recycled_mat_volume"),
+            "Recycled material value":
+                partial(ABM_CE_PV.report_output,
+                        condition="recycled_mat_value"),
+            "Producer costs":
+                partial(ABM_CE_PV.report_output, condition="producer_costs"),
+            "Consumer costs":
+                partial(ABM_CE_PV.report_output, condition="consumer_costs"),
+            "Recycler costs":
+                partial(ABM_CE_PV.report_output, condition="recycler_costs"),
+            "Refurbisher costs":
+                partial(ABM_CE_PV.report_output,
+                        condition="refurbisher_costs"),
+            "Refurbisher costs w margins":
+                partial(ABM_CE_PV.report_output,
+                        condition="refurbisher_costs_w_margins")}
+        # All simulations (Sobol matrix line and seed) of the campaign are run
+        # in one pool of processes, see ABM_CE_PV_CampaignRunner
+        all_states = ABM_CE_PV().all_states
+        row_params, jobs = sobol_jobs(X, list_variables, all_fixed_params,
+                                      all_states)
+        print("Total number of run:", len(jobs))
+        # Outputs of each simulation are stored as soon as it finishes so
+        # that an interrupted campaign resumes where it stopped, see
+        # ABM_CE_PV_CampaignStore and campaign_id
+        max_steps = 30
+        run_cache = RunCache(ABM_CE_PV)
+        campaign = campaign_id(jobs, run_cache, max_steps, model_reporters)
+        # Jobs built again must give the same campaign, otherwise a campaign
+        # launched again would not find the simulations already done
+        if campaign != campaign_id(
+                sobol_jobs(X, list_variables, all_fixed_params,
+                           all_states)[1], run_cache, max_steps,
+                model_reporters):
+            raise ValueError("Jobs of campaign are not reproducible: %s" %
+                             campaign)
+        # Outputs of simulations already run (e.g., baseline or duplicated
+        # lines) are read from the run cache, see ABM_CE_PV_RunCache
+        with CampaignStore(campaign, "SobolCampaign.sqlite") as store, \
+                CampaignRunner(ABM_CE_PV, model_reporters, max_steps,
+                               nr_processes=6,
+                               run_cache=run_cache) as runner:
+            jobs = store.remaining(jobs)
+            print("Remaining number of run:", len(jobs))
+            for (i, seed), outputs in runner.run(jobs):
+                print("Sobol matrix line: ", i, " out of ", X.shape[0],
+                      " seed: ", seed)
+                store.add((i, seed), outputs)
+            results = store.results()
+        # Results are in the order of the Sobol matrix lines and seeds
         appended_data = []
-        for i in range(X.shape[0]):
-            print("Sobol matrix line: ", i, " out of ", X.shape[0])
-            fixed_params = deepcopy(all_fixed_params)
-            for j in range(X.shape[1]):
-                value_to_change = X[i][j]
-                variable_to_change = list_variables[j]
-                if j < 1:
-                    for key in fixed_params[variable_to_change].keys():
-                        fixed_params[variable_to_change][key] += (
-                                1 - fixed_params[variable_to_change][key]) * \
-                                                                 value_to_change
-                elif j < 2:
-                    fixed_params[variable_to_change] = int(value_to_change)
-                    model_instance = ABM_CE_PV()
-                    num_states_to_add = int(value_to_change / 2) - \
-                        len(fixed_params['recycling_states'])
-                    for count_new_states in range(num_states_to_add):
-                        choice_states = [
-                            x for x in model_instance.all_states
-                            if x not in fixed_params['recycling_states']]
-                        fixed_params['recycling_states'].append(
-                            random.choice(choice_states))
-                elif j < 4:
-                    fixed_params[variable_to_change] = [
-                        x * value_to_change for x in
-                        fixed_params[variable_to_change]]
-                elif j < 5:
-                    fixed_params[variable_to_change][0] = value_to_change
-                else:
-                    fixed_params[variable_to_change] = -1 * value_to_change
-            variable_params = {"seed": list(range(0, 6))}
-            fixed_params.pop("seed")
-            batch_run = BatchRunnerMP(
-                ABM_CE_PV, nr_processes=6,
-                variable_parameters=variable_params,
-                fixed_parameters=fixed_params,
-                iterations=1,
-                max_steps=30,
-                model_reporters={
-                    "Year": lambda c: ABM_CE_PV.report_output(c, "year"),
-                    "Agents repairing": lambda c:
-                    ABM_CE_PV.count_EoL(c, "repairing"),
-                    "Agents selling": lambda c:
-                    ABM_CE_PV.count_EoL(c, "selling"),
-                    "Agents recycling": lambda c:
-                    ABM_CE_PV.count_EoL(c, "recycling"),
-                    "Agents landfilling": lambda c:
-                    ABM_CE_PV.count_EoL(c, "landfilling"),
-                    "Agents storing": lambda c:
-                    ABM_CE_PV.count_EoL(c, "hoarding"),
-                    "Agents buying new": lambda c:
-                    ABM_CE_PV.count_EoL(c, "buy_new"),
-                    "Agents buying used": lambda c:
-                    ABM_CE_PV.count_EoL(c, "buy_used"),
-                    "Agents buying certified": lambda c:
-                    ABM_CE_PV.count_EoL(c, "certified"),
-                    "Total product": lambda c:
-                    ABM_CE_PV.report_output(c, "product_stock"),
-                    "New product": lambda c:
-                    ABM_CE_PV.report_output(c, "product_stock_new"),
-                    "Used product": lambda c:
-                    ABM_CE_PV.report_output(c, "product_stock_used"),
-                    "New product_mass": lambda c:
-                    ABM_CE_PV.report_output(c, "prod_stock_new_mass"),
-                    "Used product_mass": lambda c:
-                    ABM_CE_PV.report_output(c, "prod_stock_used_mass"),
-                    "End-of-life - repaired": lambda c:
-                    ABM_CE_PV.report_output(c, "product_repaired"),
-                    "End-of-life - sold": lambda c:
-                    ABM_CE_PV.report_output(c, "product_sold"),
-                    "End-of-life - recycled": lambda c:
-                    ABM_CE_PV.report_output(c, "product_recycled"),
-                    "End-of-life - landfilled": lambda c:
-                    ABM_CE_PV.report_output(c, "product_landfilled"),
-                    "End-of-life - stored": lambda c:
-                    ABM_CE_PV.report_output(c, "product_hoarded"),
-                    "eol - new repaired weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_new_repaired"),
-                    "eol - new sold weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_new_sold"),
-                    "eol - new recycled weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_new_recycled"),
-                    "eol - new landfilled weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_new_landfilled"),
-                    "eol - new stored weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_new_hoarded"),
-                    "eol - used repaired weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_used_repaired"),
-                    "eol - used sold weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_used_sold"),
-                    "eol - used recycled weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_used_recycled"),
-                    "eol - used landfilled weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_used_landfilled"),
-                    "eol - used stored weight": lambda c:
-                    ABM_CE_PV.report_output(c, "product_used_hoarded"),
-                    "Average landfilling cost": lambda c:
-                    ABM_CE_PV.report_output(c, "average_landfill_cost"),
-                    "Average storing cost": lambda c:
-                    ABM_CE_PV.report_output(c, "average_hoarding_cost"),
-                    "Average recycling cost": lambda c:
-                    ABM_CE_PV.report_output(c, "average_recycling_cost"),
-                    "Average repairing cost": lambda c:
-                    ABM_CE_PV.report_output(c, "average_repairing_cost"),
-                    "Average selling cost": lambda c:
-                    ABM_CE_PV.report_output(c,
-                                            "average_second_hand_price"),
-                    "Recycled material volume": lambda c:
-                    ABM_CE_PV.report_output(c, "recycled_mat_volume"),
-                    "Recycled material value": lambda c:
-                    ABM_CE_PV.report_output(c, "recycled_mat_value"),
-                    "Producer costs": lambda c:
-                    ABM_CE_PV.report_output(c, "producer_costs"),
-                    "Consumer costs": lambda c:
-                    ABM_CE_PV.report_output(c, "consumer_costs"),
-                    "Recycler costs": lambda c:
-                    ABM_CE_PV.report_output(c, "recycler_costs"),
-                    "Refurbisher costs": lambda c:
-                    ABM_CE_PV.report_output(c, "refurbisher_costs"),
-                    "Refurbisher costs w margins": lambda c:
-                    ABM_CE_PV.report_output(c, "refurbisher_costs_w_margins")})
-            # Original code modified to get multiprocessing
-            batch_run.run_all()
-            run_data = batch_run.get_model_vars_dataframe()
+        for i, seed in sorted(results):
+            outputs = results[(i, seed)]
+            run_data = {"seed": seed, "Run": seed}
+            for name in sorted(outputs):
+                run_data[name] = outputs[name]
+            run_data.update(row_params[i])
             for k in range(X.shape[1]):
                 run_data["x_%s" % k] = X[i][k]
             appended_data.append(run_data)
-        appended_data = pd.concat(appended_data)
+        appended_data = pd.DataFrame(appended_data)
         appended_data["Y1"] = \
             (appended_data["End-of-life - recycled"]) / \
             (appended_data["End-of-life - recycled"] +
@@ -0,0 +1,167 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Run - campaign of simulations in a persistent pool of processes
+"""
+
+from multiprocessing import Pool, cpu_count
+
+
+# Model class, reporters and number of steps of the worker process's
+# campaign, set once when the worker starts (see init_worker)
+_campaign = {}
+
+
+def init_worker(model_cls, model_reporters, max_steps):
+    """
+    Store the campaign's model class, reporters and number of steps in the
+    worker process.
+    """
+    _campaign["model_cls"] = model_cls
+    _campaign["model_reporters"] = model_reporters
+    _campaign["max_steps"] = max_steps
+
+
+def run_simulation(model_cls, model_reporters, max_steps, kwargs):
+    """
+    Run a model to completion, or until reaching max steps, and return the
+    values of the reporters at the last step.
+    """
+    model = model_cls(**kwargs)
+    while model.running and model.schedule.steps < max_steps:
+        model.step()
+    return {name: reporter(model) for name, reporter in
+            model_reporters.items()}
+
+
+def run_job(job):
+    """
+    Run one job (key and model parameters) of the campaign in a worker
+    process and return its key and outputs.
+    """
+    key, kwargs = job
+    return key, run_simulation(_campaign["model_cls"],
+                               _campaign["model_reporters"],
+                               _campaign["max_steps"], kwargs)
+
+
+class CampaignRunner:
+    """
+    Run all the simulations (jobs) of a campaign (e.g., all rows of a Sobol
+    matrix and all seeds) in one pool of processes kept for the whole
+    campaign. Jobs are sent to workers one at a time as workers become
+    available, so that workers do not wait for the slowest simulation of a
+    batch, and outputs are returned as soon as each simulation finishes
+    (not in the order of the jobs). Reporters must be picklable (e.g.,
+    functools.partial of ABM_CE_PV.report_output rather than lambdas) if
+    processes are not forked. With a run cache, jobs whose outputs are
+    cached are not run and jobs with the same parameters (and seed) are
+    only run once.
+
+    Attributes:
+        model_cls (class of the model, e.g., ABM_CE_PV)
+        model_reporters (dictionary of outputs' names and functions of the
+            model returning them at the last step)
+        max_steps (number of steps of each simulation)
+        nr_processes (number of worker processes), (default=None, number of
+            processors available). Modeler's choice.
+        run_cache (see ABM_CE_PV_RunCache), (default=None, outputs are not
+            cached). Modeler's choice.
+        pool (pool of worker processes, None until the runner is started or
+            if nr_processes is 1, in which case jobs run in this process)
+
+    """
+
+    def __init__(self, model_cls, model_reporters, max_steps,
+                 nr_processes=None, run_cache=None):
+        """
+        Creation of the campaign runner
+        """
+        self.model_cls = model_cls
+        self.model_reporters = model_reporters
+        self.max_steps = max_steps
+        self.nr_processes = nr_processes or cpu_count()
+        self.run_cache = run_cache
+        self.pool = None
+
+    def __enter__(self):
+        """
+        Start the runner when entering a with statement.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the runner when exiting a with statement, without waiting for
+        the remaining jobs if an exception was raised.
+        """
+        if exc_type is not None and self.pool is not None:
+            self.pool.terminate()
+        self.close()
+
+    def start(self):
+        """
+        Start the pool of worker processes.
+        """
+        if self.pool is None and self.nr_processes > 1:
+            self.pool = Pool(self.nr_processes, initializer=init_worker,
+                             initargs=(self.model_cls, self.model_reporters,
+                                       self.max_steps))
+
+    def close(self):
+        """
+        Wait for the worker processes to finish and stop them.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def run(self, jobs):
+        """
+        Run jobs, an iterable of keys (e.g., (row, seed)) and dictionaries of
+        model parameters, and yield each job's key and outputs (dictionary
+        of outputs' names and values) as the job finishes. Jobs whose
+        outputs are cached are yielded first.
+        """
+        # Jobs to run, keyed by their cache key (or their position if they
+        # are not cached), with the keys of all the jobs they stand for
+        jobs_to_run = {}
+        for key, kwargs in jobs:
+            cache_key = None
+            if self.run_cache is not None:
+                cache_key = self.run_cache.key(kwargs, self.max_steps,
+                                               self.model_reporters)
+            if cache_key is None:
+                cache_key = len(jobs_to_run)
+            elif cache_key in jobs_to_run:
+                jobs_to_run[cache_key][0].append(key)
+                continue
+            else:
+                outputs = self.run_cache.get(cache_key)
+                if outputs is not None:
+                    yield key, outputs
+                    continue
+            jobs_to_run[cache_key] = ([key], kwargs)
+        for cache_key, outputs in self.run_jobs(
+                [(x, y[1]) for x, y in jobs_to_run.items()]):
+            if isinstance(cache_key, str):
+                self.run_cache.put(cache_key, outputs)
+            for key in jobs_to_run[cache_key][0]:
+                yield key, outputs
+
+    def run_jobs(self, jobs):
+        """
+        Run jobs in the pool of worker processes (or in this process if
+        nr_processes is 1) and yield their key and outputs as they finish.
+        """
+        if self.nr_processes > 1:
+            self.start()
+            yield from self.pool.imap_unordered(run_job, jobs, chunksize=1)
+        else:
+            for key, kwargs in jobs:
+                yield key, run_simulation(self.model_cls,
+                                          self.model_reporters,
+                                          self.max_steps, kwargs)
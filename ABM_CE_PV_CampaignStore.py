@@ -0,0 +1,92 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Run - store of a campaign's completed simulations
+"""
+
+import ast
+import pickle
+import sqlite3
+
+
+class CampaignStore:
+    """
+    Outputs of the completed simulations (jobs) of a campaign, stored in a
+    SQLite database as soon as each simulation finishes (one record per
+    job) so that a campaign interrupted (e.g., crash or preemption) can be
+    resumed without running again the jobs already done. Records are
+    identified by the campaign (e.g., a hash of the Sobol matrix) and the
+    job's key (e.g., (row, seed), keys must be Python literals), so that
+    records of another campaign in the same database are not read.
+
+    Attributes:
+        path (path of the SQLite database), (default="Campaign.sqlite").
+            Modeler's choice.
+        campaign (identifier of the campaign)
+        connection (connection to the database)
+
+    """
+
+    def __init__(self, campaign, path="Campaign.sqlite"):
+        """
+        Creation of the campaign store
+        """
+        self.path = path
+        self.campaign = campaign
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs (campaign TEXT, job TEXT, "
+            "outputs BLOB, PRIMARY KEY (campaign, job))")
+        self.connection.commit()
+
+    def __enter__(self):
+        """
+        Return the store when entering a with statement.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the store when exiting a with statement.
+        """
+        self.close()
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        self.connection.close()
+
+    def add(self, key, outputs):
+        """
+        Store the outputs of a job, committed to the database at once.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?)",
+            (self.campaign, repr(key), pickle.dumps(outputs)))
+        self.connection.commit()
+
+    def done(self):
+        """
+        Return the set of the keys of the jobs done.
+        """
+        cursor = self.connection.execute(
+            "SELECT job FROM runs WHERE campaign = ?", (self.campaign,))
+        return {ast.literal_eval(x) for x, in cursor}
+
+    def results(self):
+        """
+        Return a dictionary of the keys of the jobs done and their outputs.
+        """
+        cursor = self.connection.execute(
+            "SELECT job, outputs FROM runs WHERE campaign = ?",
+            (self.campaign,))
+        return {ast.literal_eval(x): pickle.loads(y) for x, y in cursor}
+
+    def remaining(self, jobs):
+        """
+        Return the jobs (keys and model parameters) that are not done.
+        """
+        done = self.done()
+        return [x for x in jobs if x[0] not in done]
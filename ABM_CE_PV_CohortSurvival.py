@@ -0,0 +1,87 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - failure of product cohorts
+"""
+
+from itertools import groupby
+from math import *
+
+
+class CohortSurvival:
+    """
+    Weibull failure fractions of product cohorts (see
+    ABM_CE_PV.waste_generation). Cohorts sharing the same average lifetime
+    and failure rate follow the same failure curve, which only depends on
+    their age. Each curve is computed once per age and shared by all calls
+    (e.g., all consumers with the same failure rate) so that a model step only
+    adds the failure fraction of the oldest age to each curve instead of
+    recomputing the fractions of all cohorts. Fractions are computed with the
+    same arithmetic as before and waste volumes are identical.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        curves (dictionary of failure curves keyed by (average lifetime,
+            failure rate), each curve is the first age it covers and the list
+            of failure fractions from that age)
+
+    """
+
+    def __init__(self, model):
+        """
+        Creation of the cohort survival engine
+        """
+        self.model = model
+        self.curves = {}
+
+    @staticmethod
+    def failure_fraction(age, avg_lifetime, failure_rate):
+        """
+        Fraction of a cohort of a given age that has failed (Weibull
+        function). The newest cohort has a negative age which makes the
+        fraction complex, only its real part is kept.
+        """
+        return (1 - e**(-((age / avg_lifetime)**failure_rate))).real
+
+    def curve(self, avg_lifetime, failure_rate, min_age, max_age):
+        """
+        Return failure fractions from min_age to max_age, computing the ages
+        missing from the curve. Ages below min_age are dropped since cohorts
+        only get older as the model steps.
+        """
+        key = (avg_lifetime, failure_rate)
+        start, fractions = self.curves.get(key, (min_age, []))
+        if min_age < start:
+            fractions = [self.failure_fraction(age, avg_lifetime, failure_rate)
+                         for age in range(min_age, start)] + fractions
+            start = min_age
+        fractions.extend(
+            self.failure_fraction(age, avg_lifetime, failure_rate) for age in
+            range(start + len(fractions), max_age + 1))
+        if min_age > start:
+            del fractions[:min_age - start]
+            start = min_age
+        self.curves[key] = (start, fractions)
+        return fractions[:max_age - min_age + 1]
+
+    def waste_generation(self, avg_lifetime, failure_rate, num_product):
+        """
+        Generate waste from each cohort of products. Consecutive cohorts with
+        the same average lifetime share a failure curve.
+        """
+        oldest_age = self.model.clock + \
+            len(self.model.total_number_product) - 1
+        fractions = []
+        for cohort_lifetime, cohorts in groupby(
+                avg_lifetime[:len(num_product)]):
+            max_age = oldest_age - len(fractions)
+            num_cohorts = len(list(cohorts))
+            if num_cohorts == 1:
+                fractions.append(self.failure_fraction(
+                    max_age, cohort_lifetime, failure_rate))
+            else:
+                fractions.extend(reversed(self.curve(
+                    cohort_lifetime, failure_rate,
+                    max_age - num_cohorts + 1, max_age)))
+        return [j * fraction for j, fraction in zip(num_product, fractions)]
@@ -9,10 +9,7 @@ Agent - Consumer
 
 from mesa import Agent
 import numpy as np
-import random
-from collections import OrderedDict
 from scipy.stats import truncnorm
-import operator
 from math import *
 
 
@@ -70,6 +67,9 @@ class Consumers(Agent):
             ={"residential": 1, "commercial": 0., "utility": 0.}). (Other
             possible values based on Bolinger et al. 2018: residential=0.21,
             commercial=0.18 and utility=0.61).
+        attributes (dictionary of the agent's randomly drawn attributes, see
+            Consumers.draw_attributes), (default=None, attributes are drawn
+            when the agent is created). Drawn in bulk by AgentFactory.
 
     """
 
@@ -78,11 +78,17 @@ class Consumers(Agent):
                  w_sn_reuse, w_pbc_reuse, w_a_reuse, landfill_cost,
                  hoarding_cost, used_product_substitution_rate,
                  att_distrib_param_eol, att_distrib_param_reuse, max_storage,
-                 consumers_distribution, product_distribution):
+                 consumers_distribution, product_distribution,
+                 attributes=None):
         """
         Creation of new consumer agent
         """
         super().__init__(unique_id, model)
+        if attributes is None:
+            attributes = self.draw_attributes(
+                failure_rate_alpha, landfill_cost, hoarding_cost,
+                used_product_substitution_rate, att_distrib_param_eol,
+                att_distrib_param_reuse, max_storage)
         self.breed = "residential"
         self.consumers_distribution = consumers_distribution
         self.trust_levels = []
@@ -106,8 +112,7 @@ class Consumers(Agent):
         self.number_used_prod_hoarded = 0
         self.product_storage_to_other = 0
         self.product_years_storage = []
-        self.max_storage = np.random.triangular(max_storage[0], max_storage[2],
-                                                max_storage[1])
+        self.max_storage = attributes["max_storage"]
         self.number_product_new = 0
         self.number_product_used = 0
         self.number_product_certified = 0
@@ -129,13 +134,9 @@ class Consumers(Agent):
             self.mass_per_function_model(self.used_products_hard_copy)
         self.product_growth_list = product_growth
         self.used_product_substitution_rate = \
-            np.random.triangular(used_product_substitution_rate[0],
-                                 used_product_substitution_rate[2],
-                                 used_product_substitution_rate[1])
+            attributes["used_product_substitution_rate"]
         self.product_growth = self.product_growth_list[0]
-        self.failure_rate_alpha = \
-            np.random.triangular(failure_rate_alpha[0], failure_rate_alpha[2],
-                                 failure_rate_alpha[1])
+        self.failure_rate_alpha = attributes["failure_rate_alpha"]
         self.perceived_behavioral_control = perceived_behavioral_control
         self.copy_perceived_behavioral_control = \
             self.perceived_behavioral_control.copy()
@@ -149,54 +150,110 @@ class Consumers(Agent):
             model.color_map.append('blue')
         else:
             model.color_map.append('green')
-        self.recycling_facility_id = model.num_consumers + random.randrange(
-            model.num_recyclers)
-        self.refurbisher_id = model.num_consumers + model.num_prod_n_recyc + \
-            random.randrange(model.num_refurbishers)
-        self.landfill_cost = random.choice(landfill_cost)
+        self.recycling_facility_id = attributes["recycling_facility_id"]
+        self.refurbisher_id = attributes["refurbisher_id"]
+        self.landfill_cost = attributes["landfill_cost"]
         #self.landfill_cost = np.random.triangular(
          #   landfill_cost[0], landfill_cost[2], landfill_cost[1])
         self.init_landfill_cost = self.landfill_cost
-        self.hoarding_cost = np.random.triangular(
-            hoarding_cost[0], hoarding_cost[2], hoarding_cost[1]) * \
-            self.max_storage
-        self.attitude_level = \
-            self.attitude_level_distribution((0 - att_distrib_param_eol[0]) /
-                                             att_distrib_param_eol[1],
-                                             (1 - att_distrib_param_eol[0]) /
-                                             att_distrib_param_eol[1],
-                                             att_distrib_param_eol[0],
-                                             att_distrib_param_eol[1])
+        self.hoarding_cost = attributes["hoarding_cost"]
+        self.attitude_level = attributes["attitude_level"]
         self.attitude_levels_pathways = [0] * len(self.model.all_EoL_pathways)
-        self.attitude_level_reuse = \
-            self.attitude_level_distribution((0 - att_distrib_param_reuse[0]) /
-                                             att_distrib_param_reuse[1],
-                                             (1 - att_distrib_param_reuse[0]) /
-                                             att_distrib_param_reuse[1],
-                                             att_distrib_param_reuse[0],
-                                             att_distrib_param_reuse[1])
+        self.attitude_level_reuse = attributes["attitude_level_reuse"]
         self.purchase_choices = list(self.model.purchase_options.keys())
         self.attitude_levels_purchase = [0] * len(self.purchase_choices)
         self.pbc_reuse = [self.model.fsthand_mkt_pric, np.nan,
                           self.model.fsthand_mkt_pric]
-        self.distances_to_customers = []
-        self.distances_to_customers = self.model.shortest_paths(
-            [random.choice(self.model.all_states)],
-            self.distances_to_customers)
-        self.random_interstate_distance = random.choice(
-            self.distances_to_customers)
+        self.distances_to_customers = attributes["distances_to_customers"]
+        self.random_interstate_distance = \
+            attributes["random_interstate_distance"]
         self.agent_breed()
         self.product_storage_to_other_ref = 0
         self.waste = []
         self.used_waste = []
+        self.waste_mass = 0
+        self.waste_average_mass_watt = 0
+        self.used_waste_mass = 0
         self.weighted_average_mass_watt = 0
         self.consumer_costs = 0
         self.past_recycled_waste = 0
         self.yearly_recycled_waste = 0
         self.sold_waste = 0
-        self.convenience = self.extended_tpb_convenience()
-        self.knowledge = self.extended_tpb_knowledge()
+        self.convenience = self.extended_tpb_convenience(
+            attributes["recycler_distance"])
+        self.knowledge = self.extended_tpb_knowledge(
+            attributes["knowledge_level"])
         #print("out func", self.knowledge)
+        # Terms of behavioral intentions that do not change over time
+        self.attitude_values = {
+            "EoL_pathway": self.tpb_attitude(
+                "EoL_pathway", self.attitude_levels_pathways,
+                self.attitude_level, self.w_a_eol),
+            "purchase_choice": self.tpb_attitude(
+                "purchase_choice", self.attitude_levels_purchase,
+                self.attitude_level_reuse, self.w_a_reuse)}
+        self.extended_tpb_values = [
+            convenience + knowledge for convenience, knowledge in
+            zip(self.convenience, self.knowledge)]
+
+    def draw_attributes(self, failure_rate_alpha, landfill_cost, hoarding_cost,
+                        used_product_substitution_rate, att_distrib_param_eol,
+                        att_distrib_param_reuse, max_storage):
+        """
+        Draw the agent's random attributes (see AgentFactory.consumers for the
+        same attributes drawn in bulk).
+        """
+        stream = self.model.random_streams.stream("attributes",
+                                                  self.unique_id)
+        attributes = {}
+        attributes["max_storage"] = stream.triangular(
+            max_storage[0], max_storage[2], max_storage[1])
+        attributes["used_product_substitution_rate"] = \
+            stream.triangular(used_product_substitution_rate[0],
+                              used_product_substitution_rate[2],
+                              used_product_substitution_rate[1])
+        attributes["failure_rate_alpha"] = \
+            stream.triangular(failure_rate_alpha[0], failure_rate_alpha[2],
+                              failure_rate_alpha[1])
+        attributes["recycling_facility_id"] = self.model.num_consumers + \
+            stream.randrange(self.model.num_recyclers)
+        attributes["refurbisher_id"] = self.model.num_consumers + \
+            self.model.num_prod_n_recyc + \
+            stream.randrange(self.model.num_refurbishers)
+        attributes["landfill_cost"] = stream.choice(landfill_cost)
+        attributes["hoarding_cost"] = stream.triangular(
+            hoarding_cost[0], hoarding_cost[2], hoarding_cost[1]) * \
+            attributes["max_storage"]
+        attributes["attitude_level"] = \
+            self.attitude_level_distribution((0 - att_distrib_param_eol[0]) /
+                                             att_distrib_param_eol[1],
+                                             (1 - att_distrib_param_eol[0]) /
+                                             att_distrib_param_eol[1],
+                                             att_distrib_param_eol[0],
+                                             att_distrib_param_eol[1])
+        attributes["attitude_level_reuse"] = \
+            self.attitude_level_distribution((0 - att_distrib_param_reuse[0]) /
+                                             att_distrib_param_reuse[1],
+                                             (1 - att_distrib_param_reuse[0]) /
+                                             att_distrib_param_reuse[1],
+                                             att_distrib_param_reuse[0],
+                                             att_distrib_param_reuse[1])
+        attributes["distances_to_customers"] = self.model.shortest_paths(
+            [stream.choice(self.model.all_states)], [])
+        attributes["random_interstate_distance"] = stream.choice(
+            attributes["distances_to_customers"])
+        # A small constant is added to avoid np.random.triangular error
+        attributes["recycler_distance"] = stream.triangular(
+            self.model.mn_mx_av_distance_to_recycler[0],
+            self.model.mn_mx_av_distance_to_recycler[2],
+            self.model.mn_mx_av_distance_to_recycler[1] + 0.001)
+        loc = self.model.extended_tpb["knowledge_distrib"][0]
+        scale = self.model.extended_tpb["knowledge_distrib"][1]
+        distribution = truncnorm((0 - loc) / scale, (1 - loc) / scale,
+                                 loc, scale)
+        attributes["knowledge_level"] = float(distribution.rvs(
+            1, random_state=stream.random_state))
+        return attributes
 
     def update_transport_costs(self):
         """
@@ -214,11 +271,14 @@ class Consumers(Agent):
         Distribute pro-environmental attitude level toward the decision in the
         population.
         """
+        stream = self.model.random_streams.stream("attributes",
+                                                  self.unique_id)
         distribution = truncnorm(a, b, loc, scale)
-        attitude_level = float(distribution.rvs(1))
+        attitude_level = float(distribution.rvs(
+            1, random_state=stream.random_state))
         return attitude_level
 
-    def extended_tpb_convenience(self):
+    def extended_tpb_convenience(self, recyc_dist):
         """
         Compute the convenience factor of the theory of planned behavior as a
         function of the distance necessary to perform the behavior.
@@ -226,11 +286,6 @@ class Consumers(Agent):
         which is approximated to the distance to the nearest recycler
         (and assumed to be independent from the recycling costs).
         """
-        # A small constant is added to avoid np.random.triangular error
-        recyc_dist = np.random.triangular(
-            self.model.mn_mx_av_distance_to_recycler[0],
-            self.model.mn_mx_av_distance_to_recycler[2],
-            self.model.mn_mx_av_distance_to_recycler[1] + 0.001)
         convenience = [0, 0, (recyc_dist -
                               self.model.mn_mx_av_distance_to_recycler[0]) /
                        self.model.mn_mx_av_distance_to_recycler[1], 0, 0]
@@ -238,15 +293,10 @@ class Consumers(Agent):
                        convenience]
         return convenience
 
-    def extended_tpb_knowledge(self):
+    def extended_tpb_knowledge(self, knowledge_level):
         """
         Distribute end-of-life management knowledge among agents.
         """
-        loc = self.model.extended_tpb["knowledge_distrib"][0]
-        scale = self.model.extended_tpb["knowledge_distrib"][1]
-        distribution = truncnorm((0 - loc) / scale, (1 - loc) / scale,
-                                 loc, scale)
-        knowledge_level = float(distribution.rvs(1))
         knowledge_eol = [knowledge_level, knowledge_level, knowledge_level,
                          0, 0]
         knowledge_eol = [self.model.extended_tpb["w_knowledge"] * x for x in
@@ -318,6 +368,9 @@ class Consumers(Agent):
             [x * self.used_product_substitution_rate for x in
              self.model.d_product_lifetimes],
             self.model.avg_failure_rate[0], self.used_products)
+        self.waste_mass = self.mass_per_function_model(self.waste)
+        self.waste_average_mass_watt = self.weighted_average_mass_watt
+        self.used_waste_mass = self.mass_per_function_model(self.used_waste)
         self.number_product_EoL = sum(self.waste)
         self.number_used_product_EoL = sum(self.used_waste)
         self.tot_prod_EoL = self.number_product_EoL + \
@@ -330,23 +383,15 @@ class Consumers(Agent):
             product - waste_new - waste_used for
             product, waste_new, waste_used in
             zip(self.number_product, self.waste, self.used_waste)]
+        self.model.consumer_aggregates.add_product_stock(self)
 
     def tpb_subjective_norm(self, decision, list_choices, weight_sn):
         """
         Calculate subjective norm (peer pressure) component of EoL TPB rule
+        (list_choices are in the order of SubjectiveNorm.choices)
         """
-        neighbors_nodes = self.model.grid.get_neighbors(self.pos,
-                                                        include_center=False)
-        proportions_choices = []
-        for i in range(len(list_choices)):
-            proportion_choice = len([
-                agent for agent in
-                self.model.grid.get_cell_list_contents(neighbors_nodes)
-                if getattr(agent, decision) == list_choices[i]]) / \
-                                len([agent for agent in
-                                     self.model.grid.get_cell_list_contents(
-                                                   neighbors_nodes)])
-            proportions_choices.append(proportion_choice)
+        proportions_choices = self.model.subjective_norm.proportions(
+            self, decision)
         return [weight_sn * x for x in proportions_choices]
 
     def tpb_perceived_behavioral_control(self, decision, pbc_choice,
@@ -362,7 +407,7 @@ class Consumers(Agent):
             self.repairable_modules(pbc_choice)
             if self.model.extended_tpb["Extended tpb"]:
                 pbc_choice = \
-                    [self.convenience[i] + self.knowledge[i] + pbc_choice[i]
+                    [self.extended_tpb_values[i] + pbc_choice[i]
                      for i in range(len(pbc_choice))]
                 max_cost = max(abs(i) for i in pbc_choice)
                 pbc_choice = [i / max_cost for i in pbc_choice]
@@ -372,13 +417,13 @@ class Consumers(Agent):
         """
         Calculate pro-environmental attitude component of EoL TPB rule. Options
         considered pro environmental get a higher score than other options.
+        Computed once when the agent is created (see attitude_values).
         """
+        eol_pathways = list(self.model.all_EoL_pathways.keys())
         for i in range(len(att_levels)):
             if decision == "EoL_pathway":
-                if list(self.model.all_EoL_pathways.keys())[i] == "repair" or \
-                        list(self.model.all_EoL_pathways.keys())[i] == "sell" \
-                        or list(self.model.all_EoL_pathways.keys())[i] == \
-                        "recycle":
+                if eol_pathways[i] == "repair" or eol_pathways[i] == "sell" \
+                        or eol_pathways[i] == "recycle":
                     att_levels[i] = att_level
                 else:
                     att_levels[i] = 1 - att_level
@@ -402,24 +447,15 @@ class Consumers(Agent):
         Account for the fact that some panels cannot be repaired
         (and thus sold).
         """
-        total_waste = 0
-        self.sold_waste = 0
-        total_volume_refurbished = 0
-        for agent in self.model.schedule.agents:
-            if self.model.num_consumers + self.model.num_prod_n_recyc <= \
-                    agent.unique_id:
-                total_volume_refurbished += agent.refurbished_volume
-            if agent.unique_id < self.model.num_consumers:
-                total_waste += agent.number_product_EoL
-                if agent.EoL_pathway == "sell":
-                    self.sold_waste += agent.number_product_EoL
-        if self.sold_waste + total_volume_refurbished > \
-                self.model.repairability * total_waste:
+        aggregates = self.model.consumer_aggregates
+        self.sold_waste = aggregates.sold_waste
+        if self.sold_waste + aggregates.total_volume_refurbished > \
+                self.model.repairability * aggregates.total_waste:
             pbc_choice[0] = 1
             pbc_choice[1] = 1
 
     def tpb_decision(self, decision, list_choices, avl_paths, weight_sn,
-                     pbc_choice, weight_pbc, att_levels, att_level, weight_a):
+                     pbc_choice, weight_pbc):
         """
         Select the decision with highest behavioral intention following the
         Theory of Planned Bahevior (TPB). Behavioral intention is a function
@@ -429,75 +465,71 @@ class Consumers(Agent):
             decision, list_choices, weight_sn)
         pbc_values = self.tpb_perceived_behavioral_control(
             decision, pbc_choice, weight_pbc)
-        a_values = self.tpb_attitude(decision, att_levels, att_level, weight_a)
+        a_values = self.attitude_values[decision]
         self.behavioral_intentions = [(pbc_values[i]) + sn_values[i] +
                                       a_values[i] for i in
                                       range(len(pbc_values))]
-        self.pathways_and_BI = {list_choices[i]: self.behavioral_intentions[i]
-                                for i in
-                                range(len(list_choices))}
-        shuffled_dic = list(self.pathways_and_BI.items())
-        random.shuffle(shuffled_dic)
-        self.pathways_and_BI = OrderedDict(shuffled_dic)
-        for key, value in self.pathways_and_BI.items():
-            if value == np.nan:
-                return self.EoL_pathway
-        conditions = False
-        removed_choice = None
-        while not conditions:
-            if removed_choice is not None:
-                self.pathways_and_BI.pop(removed_choice)
-            if decision == "purchase_choice":
-                key = max(self.pathways_and_BI.items(),
-                          key=operator.itemgetter(1))[0]
-                if self.model.purchase_options.get(key):
-                    return key
-                else:
-                    removed_choice = key
-            else:
-                key = max(self.pathways_and_BI.items(),
-                          key=operator.itemgetter(1))[0]
-                if avl_paths.get(key) and key != "sell":
-                    return key
-                else:
-                    new_installed_capacity = 0
-                    for agent in self.model.schedule.agents:
-                        if agent.unique_id < self.model.num_consumers:
-                            new_installed_capacity += agent.number_product[-1]
-                    used_volume_purchased = self.model.consumer_used_product \
-                        / self.model.num_consumers * new_installed_capacity
-                if avl_paths.get(key) and key == "sell" and \
-                        self.sold_waste < used_volume_purchased:
-                    return key
-                else:
-                    removed_choice = key
+        if decision == "purchase_choice":
+            available = [bool(self.model.purchase_options.get(x)) for x in
+                         list_choices]
+        else:
+            available = [bool(avl_paths.get(x)) for x in list_choices]
+            if "sell" in list_choices:
+                new_installed_capacity = \
+                    self.model.consumer_aggregates.new_installed_capacity
+                used_volume_purchased = self.model.consumer_used_product / \
+                    self.model.num_consumers * new_installed_capacity
+                available[list_choices.index("sell")] &= \
+                    self.sold_waste < used_volume_purchased
+        # Ties are broken at random: the first choice in a random order is
+        # selected among those with the highest behavioral intention
+        order = list(range(len(list_choices)))
+        self.model.random_streams.stream("tie_breaking",
+                                         self.unique_id).shuffle(order)
+        choice = self.masked_argmax(self.behavioral_intentions, available,
+                                    order)
+        # Consumers without available choice keep their current one
+        if choice is None:
+            return getattr(self, decision)
+        return list_choices[choice]
+
+    @staticmethod
+    def masked_argmax(values, available, order):
+        """
+        Return the index of the highest of the available values, taking the
+        first in the given order in case of ties.
+        """
+        best = None
+        for i in order:
+            if available[i] and (best is None or values[i] > values[best]):
+                best = i
+        return best
 
     def volume_used_products_purchased(self):
         """
         Count amount of remanufactured product that are bought by consumers
         """
+        past_choice = self.purchase_choice
         self.purchase_choice = \
             self.tpb_decision(
                 "purchase_choice", list(self.model.purchase_options.keys()),
                 self.model.all_EoL_pathways, self.w_sn_reuse, self.pbc_reuse,
-                self.w_pbc_reuse, self.attitude_levels_purchase,
-                self.attitude_level_reuse, self.w_a_reuse)
+                self.w_pbc_reuse)
         if self.model.seeding["Seeding"] and self.model.clock >= \
                 self.model.seeding["Year"]:
             for consumer in range(self.model.seeding["number_seed"]):
                 if self.unique_id == \
                         self.model.list_consumer_id_seed[consumer]:
-                    second_hand_p = 0
-                    repair_c = 0
-                    for agent in self.model.schedule.agents:
-                        if agent.unique_id == self.refurbisher_id:
-                            second_hand_p = agent.scd_hand_price
-                            repair_c = agent.repairing_cost
+                    refurbisher = self.model.agents_by_id[self.refurbisher_id]
+                    second_hand_p = refurbisher.scd_hand_price
+                    repair_c = refurbisher.repairing_cost
                     self.purchase_choice = "used"
                     self.model.cost_seeding += second_hand_p + repair_c + \
                         self.random_interstate_distance * \
                         self.model.transportation_cost / 1E3 * \
                         self.model.dynamic_product_average_wght
+        self.model.subjective_norm.change_choice(self, "purchase_choice",
+                                                 past_choice)
         if self.purchase_choice == "new":
             self.number_product_new += self.number_product[-1]
         elif self.EoL_pathway == "used":
@@ -520,13 +552,16 @@ class Consumers(Agent):
                         self.model.seeding_recyc["discount"]
         if product_type == "new":
             self.storage_management(limited_paths)
+            past_pathway = self.EoL_pathway
             self.EoL_pathway = \
                 self.tpb_decision(
                     "EoL_pathway", list(self.model.all_EoL_pathways.keys()),
                     limited_paths, self.w_sn_eol,
-                    self.perceived_behavioral_control, self.w_pbc_eol,
-                    self.attitude_levels_pathways, self.attitude_level,
-                    self.w_a_eol)
+                    self.perceived_behavioral_control, self.w_pbc_eol)
+            self.model.consumer_aggregates.change_pathway(self, past_pathway)
+            self.model.customer_index.change_pathway(self, past_pathway)
+            self.model.subjective_norm.change_choice(self, "EoL_pathway",
+                                                     past_pathway)
             # HERE: self.number_product_EoL + self.product_storage_to_other
             self.update_eol_volumes(self.EoL_pathway, self.number_product_EoL +
                                     self.product_storage_to_other,
@@ -539,9 +574,7 @@ class Consumers(Agent):
                 self.tpb_decision(
                     "EoL_pathway", list(self.model.all_EoL_pathways.keys()),
                     limited_paths, self.w_sn_eol,
-                    self.perceived_behavioral_control, self.w_pbc_eol,
-                    self.attitude_levels_pathways, self.attitude_level,
-                    self.w_a_eol)
+                    self.perceived_behavioral_control, self.w_pbc_eol)
             self.update_eol_volumes(self.used_EoL_pathway,
                                     self.number_used_product_EoL,
                                     product_type,
@@ -561,56 +594,46 @@ class Consumers(Agent):
             self.consumer_costs += managed_waste * \
                 self.perceived_behavioral_control[0]
             if product_type == "new":
-                self.number_new_prod_repaired += \
-                    self.mass_per_function_model(self.waste) + \
-                    self.weighted_average_mass_watt * storage
+                self.number_new_prod_repaired += self.waste_mass + \
+                    self.waste_average_mass_watt * storage
             else:
-                self.number_used_prod_repaired += \
-                    self.mass_per_function_model(self.used_waste)
+                self.number_used_prod_repaired += self.used_waste_mass
         elif eol_pathway == "sell":
             self.number_product_sold += managed_waste
             self.consumer_costs += managed_waste * \
                 self.perceived_behavioral_control[1]
             if product_type == "new":
-                self.number_new_prod_sold += \
-                    self.mass_per_function_model(self.waste) + \
-                    self.weighted_average_mass_watt * storage
+                self.number_new_prod_sold += self.waste_mass + \
+                    self.waste_average_mass_watt * storage
             else:
-                self.number_used_prod_sold += \
-                    self.mass_per_function_model(self.used_waste)
+                self.number_used_prod_sold += self.used_waste_mass
         elif eol_pathway == "recycle":
             self.number_product_recycled += managed_waste
             if not self.model.epr_business_model:
                 self.consumer_costs += managed_waste * \
                                        self.perceived_behavioral_control[2]
             if product_type == "new":
-                self.number_new_prod_recycled += \
-                    self.mass_per_function_model(self.waste) + \
-                    self.weighted_average_mass_watt * storage
+                self.number_new_prod_recycled += self.waste_mass + \
+                    self.waste_average_mass_watt * storage
             else:
-                self.number_used_prod_recycled += \
-                    self.mass_per_function_model(self.used_waste)
+                self.number_used_prod_recycled += self.used_waste_mass
         elif eol_pathway == "landfill":
             self.number_product_landfilled += managed_waste
             self.consumer_costs += managed_waste * \
                 self.perceived_behavioral_control[3]
             if product_type == "new":
-                self.number_new_prod_landfilled += \
-                    self.mass_per_function_model(self.waste) + \
-                    self.weighted_average_mass_watt * storage
+                self.number_new_prod_landfilled += self.waste_mass + \
+                    self.waste_average_mass_watt * storage
             else:
-                self.number_used_prod_landfilled += \
-                    self.mass_per_function_model(self.used_waste)
+                self.number_used_prod_landfilled += self.used_waste_mass
         else:
             self.number_product_hoarded += managed_waste
             self.consumer_costs += managed_waste * \
                 self.perceived_behavioral_control[4]
             if product_type == "new":
-                self.number_new_prod_hoarded += \
-                    self.mass_per_function_model(self.waste)
+                self.number_new_prod_hoarded += self.waste_mass
             else:
-                self.number_used_prod_hoarded += \
-                    self.mass_per_function_model(self.used_waste)
+                self.number_used_prod_hoarded += self.used_waste_mass
 
     def update_yearly_recycled_waste(self, installer):
         """
@@ -627,16 +650,14 @@ class Consumers(Agent):
         module was manufactured and the average weight-to-power ratio at that
         time. The model from IRENA-IEA 2016 is used.
         """
-        mass_conversion_coeffs = [
-            self.model.product_average_wght * e**(
-                - self.model.mass_to_function_reg_coeff * x) for x in
-            range(len(product_as_function))]
-        product_as_mass = [product_as_function[i] * mass_conversion_coeffs[i]
-                           for i in range(len(product_as_function))]
+        mass_conversion_coeffs = self.model.extend_mass_conversion_coeffs(
+            len(product_as_function))
+        product_as_mass = [product * coeff for product, coeff in
+                           zip(product_as_function, mass_conversion_coeffs)]
         mass_eol = sum(product_as_mass)
         self.weighted_average_mass_watt = sum(
-            [product_as_mass[i] / mass_eol * mass_conversion_coeffs[i] for i
-             in range(len(mass_conversion_coeffs)) if mass_eol != 0])
+            [mass / mass_eol * coeff for mass, coeff in
+             zip(product_as_mass, mass_conversion_coeffs) if mass_eol != 0])
         return mass_eol
 
     def storage_management(self, limited_paths):
@@ -668,16 +689,13 @@ class Consumers(Agent):
         behavioral control are updated according to processes from other agents
         or own initiated costs.
         """
-        for agent in self.model.schedule.agents:
-            if agent.unique_id == self.recycling_facility_id:
-                self.perceived_behavioral_control[2] = \
-                    agent.recycling_cost
-            elif agent.unique_id == self.refurbisher_id:
-                self.perceived_behavioral_control[0] = \
-                    agent.repairing_cost
-                self.perceived_behavioral_control[1] = -1 * \
-                    agent.scd_hand_price * (1 - agent.refurbisher_margin)
-                self.pbc_reuse[1] = agent.scd_hand_price
+        recycler = self.model.agents_by_id[self.recycling_facility_id]
+        refurbisher = self.model.agents_by_id[self.refurbisher_id]
+        self.perceived_behavioral_control[2] = recycler.recycling_cost
+        self.perceived_behavioral_control[0] = refurbisher.repairing_cost
+        self.perceived_behavioral_control[1] = -1 * \
+            refurbisher.scd_hand_price * (1 - refurbisher.refurbisher_margin)
+        self.pbc_reuse[1] = refurbisher.scd_hand_price
         self.pbc_reuse[0] = self.model.fsthand_mkt_pric
         self.perceived_behavioral_control[3] = self.landfill_cost
         self.perceived_behavioral_control[4] = self.hoarding_cost
@@ -686,14 +704,16 @@ class Consumers(Agent):
         """
         Account for new and used products' volumes in mass unit.
         """
-        last_capacity_new = [0] * len(self.new_products_hard_copy)
-        last_capacity_new[-1] = self.new_products_hard_copy[-1]
-        last_capacity_used = [0] * len(self.used_products_hard_copy)
-        last_capacity_used[-1] = self.used_products_hard_copy[-1]
+        last_year = len(self.new_products_hard_copy) - 1
+        mass_conversion_coeff = self.model.extend_mass_conversion_coeffs(
+            last_year + 1)[last_year]
         self.new_products_mass += \
-            self.mass_per_function_model(last_capacity_new)
-        self.used_products_mass += \
-            self.mass_per_function_model(last_capacity_used)
+            self.new_products_hard_copy[-1] * mass_conversion_coeff
+        last_capacity_used_mass = \
+            self.used_products_hard_copy[-1] * mass_conversion_coeff
+        self.used_products_mass += last_capacity_used_mass
+        self.weighted_average_mass_watt = mass_conversion_coeff if \
+            last_capacity_used_mass != 0 else 0
 
     def step(self):
         """
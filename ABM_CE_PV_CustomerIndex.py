@@ -0,0 +1,122 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - consumers assigned to each refurbisher and recycler
+"""
+
+from bisect import insort
+from operator import attrgetter
+import numpy as np
+
+
+class CustomerIndex:
+    """
+    Index of the consumers assigned to each refurbisher (refurbisher's
+    customers), in the order of their unique_id (as in model.schedule), and
+    split by their current end of life (EoL) pathway. Refurbishers iterate
+    over their own customers instead of the whole population. Consumers
+    update the split when they change pathway (see
+    Consumers.update_product_eol), with the vectorized engine the split is
+    rebuilt once consumers have stepped.
+    The index also holds the recycler assigned to each consumer (recycler's
+    catchment). Sums over each catchment, and the population totals read by
+    recyclers (see Recyclers.triage), are computed at once for all recyclers
+    in each step.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        consumers (list of consumer agents)
+        recyclers (list of recycler agents)
+        customers (dictionary of refurbishers' unique_id and lists of their
+            customers)
+        customers_by_pathway (dictionary of refurbishers' unique_id and
+            dictionaries of EoL pathways and lists of customers)
+        catchments (array of the position of each consumer's recycler in
+            recyclers)
+        catchment_recycled_waste (list of the sum of consumers'
+            yearly_recycled_waste in each catchment)
+        waste_sold (sum of number_product_EoL of consumers whose EoL pathway
+            is "sell")
+        used_installed_capacity (sum of the last element of number_product
+            of consumers buying used products)
+
+    """
+
+    def __init__(self, model):
+        """
+        Creation of the index from the model's agents
+        """
+        self.model = model
+        self.consumers = model.consumers
+        self.recyclers = model.recyclers
+        self.customers = {agent.unique_id: [] for agent in model.refurbishers}
+        for agent in self.consumers:
+            self.customers[agent.refurbisher_id].append(agent)
+        self.customers_by_pathway = {}
+        self.update_pathways()
+        self.catchments = np.array(
+            [agent.recycling_facility_id for agent in self.consumers],
+            dtype=int) - model.num_consumers
+        self.catchment_recycled_waste = [0] * model.num_recyclers
+        self.waste_sold = 0
+        self.used_installed_capacity = 0
+
+    def update_pathways(self):
+        """
+        Split all refurbishers' customers by their current EoL pathway.
+        """
+        for refurbisher_id, customers in self.customers.items():
+            by_pathway = {x: [] for x in self.model.all_EoL_pathways}
+            for agent in customers:
+                by_pathway.setdefault(agent.EoL_pathway, []).append(agent)
+            self.customers_by_pathway[refurbisher_id] = by_pathway
+
+    def change_pathway(self, consumer, past_pathway):
+        """
+        Move a consumer that changed EoL pathway in its refurbisher's split.
+        """
+        if past_pathway != consumer.EoL_pathway:
+            by_pathway = self.customers_by_pathway[consumer.refurbisher_id]
+            by_pathway[past_pathway].remove(consumer)
+            insort(by_pathway.setdefault(consumer.EoL_pathway, []), consumer,
+                   key=attrgetter("unique_id"))
+
+    def update_catchments(self):
+        """
+        Compute the sums over recyclers' catchments and the totals read by
+        recyclers, in one pass over consumers. Sums are accumulated in the
+        order of consumers' unique_id.
+        """
+        model = self.model
+        if model.engine == "vectorized":
+            store = model.consumer_store
+            recycled_waste = store.yearly_recycled_waste
+            sold = store.EoL_pathway == store.eol_choices.index("sell")
+            used = store.purchase_choice == \
+                store.purchase_choices.index("used")
+            self.waste_sold = float(store.number_product_EoL[sold].sum())
+            self.used_installed_capacity = float(
+                store.number_product[used, store.num_cohorts - 1].sum())
+        else:
+            recycled_waste = []
+            self.waste_sold = 0
+            self.used_installed_capacity = 0
+            for agent in self.consumers:
+                recycled_waste.append(agent.yearly_recycled_waste)
+                if agent.EoL_pathway == "sell":
+                    self.waste_sold += agent.number_product_EoL
+                if agent.purchase_choice == "used":
+                    self.used_installed_capacity += agent.number_product[-1]
+        self.catchment_recycled_waste = np.bincount(
+            self.catchments, weights=recycled_waste,
+            minlength=model.num_recyclers).tolist()
+
+    def refurbisher_customers(self, refurbisher_id, eol_pathway=None):
+        """
+        Return a refurbisher's customers, only those currently in eol_pathway
+        if given.
+        """
+        if eol_pathway is None:
+            return self.customers[refurbisher_id]
+        return self.customers_by_pathway[refurbisher_id].get(eol_pathway, [])
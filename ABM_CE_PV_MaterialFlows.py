@@ -0,0 +1,250 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - material flows of all producers
+"""
+
+import numpy as np
+
+
+class MaterialFlows:
+    """
+    Materials recovered, industrial waste generated and costs of all
+    producers (see Producers), computed with array operations once per step
+    by the model. Materials' properties (product_mass_fractions,
+    recovery_fractions, established_scd_mkt, material_waste_ratio and
+    virgin_mat_prices) are vectors aligned on materials, and producers are
+    assigned to the material they produce with a producer x material
+    matrix. Producers' quantities are vectors aligned on model.producers and
+    are copied to the producer agents at each update. Sums over neighbors
+    (or materials) are accumulated in the same order as when each producer
+    computed them (see MaterialFlows.sequential_sum).
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        materials (list of materials, in the order of the vectors)
+        product_mass_fractions (array of mass fractions of materials in the
+            product)
+        recovery_fractions (array of recovery fractions of materials)
+        established_scd_mkt (boolean array, True if materials have an
+            established secondary market)
+        industrial_waste_ratio (array of the industrial waste generated per
+            unit of product for each material)
+        virgin_mat_prices (array of the mode of virgin materials prices)
+        assignment (array, 1 if producer row produces material column)
+        material_index (array of the index of the material produced by each
+            producer)
+        producers_per_material (array of the number of producers of each
+            material)
+        neighbor_producers (array of the number of producers of each
+            material among the neighbors of each agent of the industrial
+            symbiosis (IS) network)
+        neighbors (array of the IS indices of each producer's neighbors,
+            padded to the largest number of neighbors)
+        has_neighbor (boolean array, True where neighbors is not padding)
+        recycled_mat_price (array of producers' secondary materials prices)
+        virgin_mat_price (array of producers' virgin materials prices)
+        recycled_material_volume, yearly_recycled_material_volume,
+            recycled_material_value, industrial_waste_generated,
+            yearly_industrial_waste_generated, avoided_costs_virgin_materials,
+            transport_cost_industrial_waste, producer_costs (arrays of
+            producers' quantities, see Producers)
+        material_revenue (sum over producers of the value of their yearly
+            recycled material volume)
+
+    """
+
+    def __init__(self, model, virgin_mat_prices):
+        """
+        Creation of the material flows from the model's producers, once all
+        agents are placed on the network
+        """
+        self.model = model
+        self.materials = list(model.product_mass_fractions.keys())
+        self.product_mass_fractions = self.material_vector(
+            model.product_mass_fractions)
+        self.recovery_fractions = self.material_vector(
+            model.recovery_fractions)
+        self.established_scd_mkt = self.material_vector(
+            model.established_scd_mkt).astype(bool)
+        self.industrial_waste_ratio = self.material_vector(
+            model.material_waste_ratio) * self.product_mass_fractions
+        self.virgin_mat_prices = self.material_vector(
+            {k: v[2] for k, v in virgin_mat_prices.items()})
+        producers = model.producers
+        self.material_index = np.array(
+            [self.materials.index(x.material_produced) for x in producers],
+            dtype=int)
+        self.assignment = np.zeros((len(producers), len(self.materials)))
+        self.assignment[np.arange(len(producers)), self.material_index] = 1
+        self.producers_per_material = \
+            self.assignment.sum(axis=0).astype(int)
+        first_node = model.num_consumers
+        adjacency = model.neighbor_cache.adjacency(
+            first_node, first_node + model.num_prod_n_recyc)
+        self.neighbor_producers = np.asarray(
+            adjacency[:, model.num_recyclers:] @ self.assignment).astype(int)
+        neighbors = [[x - first_node for x in
+                      model.neighbor_cache.neighbors[agent.pos]]
+                     for agent in producers]
+        max_neighbors = max([len(x) for x in neighbors], default=0)
+        self.neighbors = np.zeros((len(producers), max_neighbors), dtype=int)
+        self.has_neighbor = np.zeros((len(producers), max_neighbors),
+                                     dtype=bool)
+        for i, x in enumerate(neighbors):
+            self.neighbors[i, :len(x)] = x
+            self.has_neighbor[i, :len(x)] = True
+        self.recycled_mat_price = np.array(
+            [x.recycled_mat_price for x in producers], dtype=float)
+        self.virgin_mat_price = np.array(
+            [x.virgin_mat_prices for x in producers], dtype=float)
+        for name in ["recycled_material_volume",
+                     "yearly_recycled_material_volume",
+                     "recycled_material_value", "industrial_waste_generated",
+                     "yearly_industrial_waste_generated",
+                     "avoided_costs_virgin_materials",
+                     "transport_cost_industrial_waste", "producer_costs"]:
+            setattr(self, name, np.array(
+                [getattr(x, name) for x in producers], dtype=float))
+        self.material_revenue = 0
+
+    def material_vector(self, values):
+        """
+        Return the values of a dictionary keyed by material as an array
+        aligned on materials.
+        """
+        return np.array([values[x] for x in self.materials], dtype=float)
+
+    def count_producer_type(self, producer_type):
+        """
+        Return the number of producers of a material.
+        """
+        if producer_type not in self.materials:
+            return 0
+        return int(self.producers_per_material[
+            self.materials.index(producer_type)])
+
+    @staticmethod
+    def sequential_sum(initial, terms):
+        """
+        Add the columns of terms one after the other to initial (cumulative
+        sum, in the same order as a loop over the columns).
+        """
+        return np.cumsum(np.column_stack([initial, terms]), axis=1)[:, -1]
+
+    def update_industrial_waste(self):
+        """
+        Generate industrial waste of producers of the product.
+        """
+        model = self.model
+        if "Product" not in self.materials:
+            return
+        product = self.materials.index("Product")
+        is_product = self.material_index == product
+        if not is_product.any():
+            return
+        ind_waste = sum(self.industrial_waste_ratio.tolist()) * \
+            model.total_yearly_new_products / \
+            self.producers_per_material[product]
+        self.industrial_waste_generated[is_product] += ind_waste
+        self.yearly_industrial_waste_generated[is_product] = ind_waste
+        self.update_producers(["industrial_waste_generated",
+                               "yearly_industrial_waste_generated"])
+
+    def update_recovered_volumes(self):
+        """
+        Compute exchanged volumes from industrial synergy for all producers.
+        Mathematical model adapted from Ghali et al. 2017 (see
+        RecoveryAccounting for the installer recycled amount and the total
+        recycling volume).
+        """
+        model = self.model
+        mass_fractions = self.product_mass_fractions[self.material_index]
+        recovery_fractions = self.recovery_fractions[self.material_index]
+        if model.industrial_symbiosis:
+            recycling_volume = np.array(
+                [x.recycling_volume for x in model.recyclers +
+                 model.producers], dtype=float)[self.neighbors]
+            num_neighbors_producer = np.where(
+                recycling_volume > 0, self.neighbor_producers[
+                    self.neighbors, self.material_index[:, None]], 0)
+            num_neighbors_producer[num_neighbors_producer == 0] = 1
+            recl_vol = mass_fractions[:, None] * (
+                recycling_volume + model.installer_recycled_amount) / \
+                num_neighbors_producer * \
+                model.dynamic_product_average_wght * \
+                recovery_fractions[:, None]
+            rows = np.array([x.agent_i for x in model.producers], dtype=int)
+            recovered = self.has_neighbor & (
+                self.established_scd_mkt[self.material_index][:, None] |
+                (np.asarray(model.willingness)[rows[:, None], self.neighbors]
+                 >= model.willingness_threshold))
+            recl_vol = np.where(recovered, recl_vol, 0)
+            self.recycled_material_volume = self.sequential_sum(
+                self.recycled_material_volume, recl_vol)
+            self.yearly_recycled_material_volume = self.sequential_sum(
+                np.zeros(len(recl_vol)), recl_vol)
+        else:
+            num_neighbors_producer = \
+                self.producers_per_material[self.material_index]
+            recl_vol = mass_fractions * \
+                model.accounting.total_recycling_volume / \
+                num_neighbors_producer * \
+                model.dynamic_product_average_wght * recovery_fractions
+            self.recycled_material_volume += recl_vol
+            self.yearly_recycled_material_volume = recl_vol
+        self.recycled_material_value = self.recycled_mat_price * \
+            self.recycled_material_volume
+        self.update_producers(["recycled_material_volume",
+                               "yearly_recycled_material_volume",
+                               "recycled_material_value"])
+
+    def update_costs(self):
+        """
+        Compute societal costs of producers (see Producers) and the value of
+        materials they recovered.
+        """
+        model = self.model
+        yearly_volume = self.yearly_recycled_material_volume
+        yearly_waste = self.yearly_industrial_waste_generated
+        self.avoided_costs_virgin_materials = np.where(
+            np.isnan(self.virgin_mat_price), 0, yearly_volume * (
+                self.recycled_mat_price - self.virgin_mat_price))
+        avd_costs_industrial_waste = np.zeros(len(yearly_waste))
+        if not model.epr_business_model:
+            self.transport_cost_industrial_waste = yearly_waste * (
+                (model.yearly_product_wght * model.transportation_cost /
+                 1E3 * model.mean_distance_within_state) +
+                model.average_landfill_cost)
+        else:
+            self.transport_cost_industrial_waste = np.zeros(len(yearly_waste))
+            if "Product" in self.materials:
+                is_product = \
+                    self.material_index == self.materials.index("Product")
+                priced = ~np.isnan(self.virgin_mat_prices)
+                avd_costs = -1 * yearly_waste[is_product, None] * \
+                    self.industrial_waste_ratio[priced] * \
+                    self.virgin_mat_prices[priced]
+                avd_costs_industrial_waste[is_product] = \
+                    self.sequential_sum(np.zeros(len(avd_costs)), avd_costs)
+        self.producer_costs += (self.avoided_costs_virgin_materials +
+                                avd_costs_industrial_waste +
+                                self.transport_cost_industrial_waste)
+        revenue = np.where(np.isnan(yearly_volume) |
+                           np.isnan(self.recycled_mat_price), 0,
+                           yearly_volume * self.recycled_mat_price)
+        self.material_revenue = float(self.sequential_sum(
+            np.zeros(1), revenue[None, :])[0])
+        self.update_producers(["avoided_costs_virgin_materials",
+                               "transport_cost_industrial_waste",
+                               "producer_costs"])
+
+    def update_producers(self, names):
+        """
+        Copy producers' quantities to the producer agents.
+        """
+        values = [getattr(self, x).tolist() for x in names]
+        for agent, agent_values in zip(self.model.producers, zip(*values)):
+            for name, value in zip(names, agent_values):
+                setattr(agent, name, value)
@@ -9,10 +9,23 @@ Model - agent-based simulations of the circular economy (ABSiCE)
 
 from mesa import Model
 from ABM_CE_PV_ConsumerAgents import Consumers
+from ABM_CE_PV_VectorizedConsumers import ConsumerStore, VectorizedConsumers
+from ABM_CE_PV_Aggregates import ConsumerAggregates
+from ABM_CE_PV_Reporters import ModelReports
+from ABM_CE_PV_StateDistances import load_state_distances
+from ABM_CE_PV_AgentFactory import AgentFactory
+from ABM_CE_PV_CohortSurvival import CohortSurvival
+from ABM_CE_PV_CustomerIndex import CustomerIndex
+from ABM_CE_PV_TrustNetwork import TrustNetwork
+from ABM_CE_PV_NeighborCache import NeighborCache
+from ABM_CE_PV_SubjectiveNorm import SubjectiveNorm
+from ABM_CE_PV_Scheduler import PhaseScheduler
+from ABM_CE_PV_Accounting import RecoveryAccounting
+from ABM_CE_PV_MaterialFlows import MaterialFlows
+from ABM_CE_PV_RandomStreams import RandomStreams
 from ABM_CE_PV_RecyclerAgents import Recyclers
 from ABM_CE_PV_RefurbisherAgents import Refurbishers
 from ABM_CE_PV_ProducerAgents import Producers
-from mesa.time import BaseScheduler
 from mesa.space import NetworkGrid
 from mesa.datacollection import DataCollector
 import networkx as nx
@@ -20,7 +33,10 @@ import numpy as np
 from math import *
 import matplotlib.pyplot as plt
 import pandas as pd
+import pickle
 import random
+import time
+from functools import partial
 
 
 class ABM_CE_PV(Model):
@@ -201,6 +217,40 @@ class ABM_CE_PV(Model):
         recycling_process (dictionary of booleans), (default={"frelp": False,
             "asu": False, "hybrid": False}). Modeler's choice.
         industrial_symbiosis (boolean), (default=False). Modeler's choice.
+        engine ("agents": consumers are stepped one at a time, "vectorized":
+            the consumer population is stepped at once from arrays, see
+            ABM_CE_PV_VectorizedConsumers), (default="agents"). Modeler's
+            choice.
+        sequential_aggregates (boolean: if True, population totals read by
+            consumers during their decisions (e.g., total waste sold) include
+            the changes made by consumers stepped before them, otherwise
+            totals are those of the beginning of the step), (default=True).
+            Modeler's choice.
+        bulk_init (boolean: if True, agents' random attributes are drawn at
+            once for each agent type from streams spawned from the seed, see
+            ABM_CE_PV_AgentFactory, otherwise they are drawn one agent at a
+            time), (default=False). Modeler's choice.
+        trust_update ("agents": producers update their trust in each agent of
+            the industrial symbiosis network one pair at a time, "vectorized":
+            producers update all their trusts at once with matrix operations
+            and draw the same random numbers as "agents", but from the trusts
+            at the beginning of their update (the pairs' loop of "agents"
+            reads trusts already updated in the loop), so outputs differ from
+            those of "agents", "batched": the trusts of all producers are
+            updated at once with one random social event per producer and
+            agent, see ABM_CE_PV_TrustNetwork), (default="agents").
+            Modeler's choice.
+        sequential_subjective_norm (boolean: if True, the subjective norm of
+            consumers includes the choices made by neighbors stepped before
+            them, otherwise choices are those of the beginning of the step,
+            see ABM_CE_PV_SubjectiveNorm), (default=True). Modeler's choice.
+        common_random_numbers (boolean: if True, each agent and each
+            stochastic process (e.g., attributes' draws, social events,
+            tie-breaking shuffles) draws from its own stream derived from the
+            seed, so that scenarios compared with the same seed share their
+            random numbers, otherwise all draws are from the global
+            generators, see ABM_CE_PV_RandomStreams), (default=False).
+            Modeler's choice.
 
     """
 
@@ -339,7 +389,13 @@ class ABM_CE_PV(Model):
                  seeding={"Seeding": False,
                           "Year": 10, "number_seed": 50},
                  seeding_recyc={"Seeding": False,
-                          "Year": 10, "number_seed": 50, "discount": 0.35}):
+                          "Year": 10, "number_seed": 50, "discount": 0.35},
+                 engine="agents",
+                 sequential_aggregates=True,
+                 bulk_init=False,
+                 trust_update="agents",
+                 sequential_subjective_norm=True,
+                 common_random_numbers=False):
         """
         Initiate model
         """
@@ -356,6 +412,7 @@ class ABM_CE_PV(Model):
         # w_sn_eol = w_sn_eol * calibration_n_sensitivity_5
         np.random.seed(self.seed)
         random.seed(self.seed)
+        self.random_streams = RandomStreams(self.seed, common_random_numbers)
         self.num_consumers = num_consumers
         self.consumers_node_degree = consumers_node_degree
         self.consumers_network_type = consumers_network_type
@@ -394,9 +451,9 @@ class ABM_CE_PV(Model):
         self.imperfect_substitution = imperfect_substitution
         perceived_behavioral_control = [np.nan] * len(all_EoL_pathways)
         # Adjacency matrix of trust network: trust of row index into column
-        self.trust_prod = np.asmatrix(np.random.uniform(
+        self.trust_prod = self.random_streams.stream("trust").uniform(
             init_trust_boundaries[0], init_trust_boundaries[1],
-            (self.num_prod_n_recyc, self.num_prod_n_recyc)))
+            (self.num_prod_n_recyc, self.num_prod_n_recyc))
         np.fill_diagonal(self.trust_prod, 0)
         self.social_event_boundaries = social_event_boundaries
         self.trust_threshold = trust_threshold
@@ -409,6 +466,7 @@ class ABM_CE_PV(Model):
         self.established_scd_mkt = established_scd_mkt
         self.recovery_fractions = recovery_fractions
         self.product_average_wght = product_average_wght
+        self.mass_conversion_coeffs = []
         self.dynamic_product_average_wght = product_average_wght
         self.yearly_product_wght = product_average_wght
         self.transportation_cost = transportation_cost
@@ -427,15 +485,26 @@ class ABM_CE_PV(Model):
         self.seeding = seeding
         self.seeding_recyc = seeding_recyc
         self.cost_seeding = 0
+        if engine not in ["agents", "vectorized"]:
+            raise ValueError("Unknown consumer engine: %s" % engine)
+        self.engine = engine
+        if trust_update not in ["agents", "vectorized", "batched"]:
+            raise ValueError("Unknown trust update: %s" % trust_update)
+        self.trust_update = trust_update
+        self.consumer_aggregates = ConsumerAggregates(self,
+                                                      sequential_aggregates)
         self.product_lifetime = product_lifetime
+        self.cohort_survival = CohortSurvival(self)
         self.d_product_lifetimes = []
         self.update_dynamic_lifetime()
         self.original_recycling_cost = original_recycling_cost
         self.recycling_process = recycling_process
         self.list_consumer_id = list(range(num_consumers))
-        random.shuffle(self.list_consumer_id)
+        self.random_streams.stream("consumer_order").shuffle(
+            self.list_consumer_id)
         self.list_consumer_id_seed = list(range(num_consumers))
-        random.shuffle(self.list_consumer_id_seed)
+        self.random_streams.stream("seeding_order").shuffle(
+            self.list_consumer_id_seed)
         # Change recovery fractions and recycling costs depending on recycling
         # process
         self.recycling_process_change()
@@ -454,7 +523,14 @@ class ABM_CE_PV(Model):
         self.G = nx.disjoint_union(self.H1, self.H2)
         self.G = nx.disjoint_union(self.G, self.H3)
         self.grid = NetworkGrid(self.G)
-        self.schedule = BaseScheduler(self)
+        self.trust_network = TrustNetwork(self)
+        self.schedule = PhaseScheduler(
+            self, ["consumers", "recyclers", "producers", "refurbishers"])
+        # Agents of each type, in the order of their unique_id
+        self.consumers = self.schedule.agents_by_type["consumers"]
+        self.recyclers = self.schedule.agents_by_type["recyclers"]
+        self.producers = self.schedule.agents_by_type["producers"]
+        self.refurbishers = self.schedule.agents_by_type["refurbishers"]
         # Compute distance for the repair, sell, recycle, landfill and storage
         # pathways. Assumptions: 1) Only certain states have recycling
         # facilities, 2) The refurbisher who performs repair and
@@ -479,12 +555,9 @@ class ABM_CE_PV(Model):
         # Compute distances
         self.mean_distance_within_state = np.nanmean(
             np.where(self.states != 0, self.states, np.nan)) / 2
-        self.states_graph = nx.from_numpy_matrix(self.states)
-        nodes_states_dic = \
-            dict(zip(list(self.states_graph.nodes),
-                     list(pd.read_csv("StatesAdjacencyMatrix.csv"))))
-        self.states_graph = nx.relabel_nodes(self.states_graph,
-                                             nodes_states_dic)
+        states_names, self.state_distances = \
+            load_state_distances("StatesAdjacencyMatrix.csv")
+        self.state_index = {x: i for i, x in enumerate(states_names)}
         self.recycling_states = recycling_states
         distances_to_recyclers = []
         distances_to_recyclers = self.shortest_paths(
@@ -508,182 +581,254 @@ class ABM_CE_PV(Model):
                          landfill_cost]
 
         # Create agents, G nodes labels are equal to agents' unique_ID
+        if self.engine == "vectorized":
+            self.consumer_store = ConsumerStore(self, self.num_consumers)
+            consumer_class = VectorizedConsumers
+        else:
+            consumer_class = Consumers
+        if bulk_init:
+            agent_factory = AgentFactory(self, self.seed)
+            consumer_attributes = agent_factory.consumers(
+                failure_rate_alpha, landfill_cost, hoarding_cost,
+                used_product_substitution_rate, att_distrib_param_eol,
+                att_distrib_param_reuse, max_storage)
+            recycler_attributes = agent_factory.recyclers(
+                self.original_recycling_cost,
+                social_influencability_boundaries)
+            producer_attributes = agent_factory.producers(
+                scd_mat_prices, virgin_mat_prices,
+                social_influencability_boundaries, self_confidence_boundaries)
+            refurbisher_attributes = agent_factory.refurbishers(
+                original_repairing_cost, scndhand_mkt_pric_rate,
+                refurbisher_margin, max_storage)
+        else:
+            consumer_attributes = [None] * self.num_consumers
+            recycler_attributes = [None] * self.num_recyclers
+            producer_attributes = [None] * self.num_producers
+            refurbisher_attributes = [None] * self.num_refurbishers
         for node in self.G.nodes():
             if node < self.num_consumers:
-                a = Consumers(node, self, product_growth, failure_rate_alpha,
-                              perceived_behavioral_control, w_sn_eol,
-                              w_pbc_eol, w_a_eol, w_sn_reuse, w_pbc_reuse,
-                              w_a_reuse, landfill_cost, hoarding_cost,
-                              used_product_substitution_rate,
-                              att_distrib_param_eol, att_distrib_param_reuse,
-                              max_storage, consumers_distribution,
-                              product_distribution)
-                self.schedule.add(a)
+                a = consumer_class(
+                    node, self, product_growth, failure_rate_alpha,
+                    perceived_behavioral_control, w_sn_eol, w_pbc_eol,
+                    w_a_eol, w_sn_reuse, w_pbc_reuse, w_a_reuse,
+                    landfill_cost, hoarding_cost,
+                    used_product_substitution_rate, att_distrib_param_eol,
+                    att_distrib_param_reuse, max_storage,
+                    consumers_distribution, product_distribution,
+                    consumer_attributes[node])
+                self.schedule.add(a, "consumers")
                 # Add the agent to the node
                 self.grid.place_agent(a, node)
             elif node < self.num_recyclers + self.num_consumers:
                 b = Recyclers(node, self, self.original_recycling_cost,
                               init_eol_rate,
                               recycling_learning_shape_factor,
-                              social_influencability_boundaries)
-                self.schedule.add(b)
+                              social_influencability_boundaries,
+                              recycler_attributes[node - self.num_consumers])
+                self.schedule.add(b, "recyclers")
                 self.grid.place_agent(b, node)
             elif node < self.num_prod_n_recyc + self.num_consumers:
                 c = Producers(node, self, scd_mat_prices, virgin_mat_prices,
                               social_influencability_boundaries,
-                              self_confidence_boundaries)
-                self.schedule.add(c)
+                              self_confidence_boundaries,
+                              producer_attributes[
+                                  node - self.num_consumers -
+                                  self.num_recyclers])
+                self.schedule.add(c, "producers")
                 self.grid.place_agent(c, node)
             else:
                 d = Refurbishers(node, self, original_repairing_cost,
                                  init_eol_rate,
                                  repairing_learning_shape_factor,
                                  scndhand_mkt_pric_rate, refurbisher_margin,
-                                 max_storage)
-                self.schedule.add(d)
+                                 max_storage,
+                                 refurbisher_attributes[
+                                     node - self.num_consumers -
+                                     self.num_prod_n_recyc])
+                self.schedule.add(d, "refurbishers")
                 self.grid.place_agent(d, node)
+        # Registry of agents by unique_id
+        self.agents_by_id = {agent.unique_id: agent for agent in
+                             self.schedule.agents}
+        self.neighbor_cache = NeighborCache(self)
+        self.subjective_norm = SubjectiveNorm(self,
+                                              sequential_subjective_norm)
+        if self.engine == "vectorized":
+            self.consumer_store.freeze()
+        self.customer_index = CustomerIndex(self)
+        self.material_flows = MaterialFlows(self, virgin_mat_prices)
+        self.accounting = RecoveryAccounting(self)
         # Draw initial graph
         # nx.draw(self.G, with_labels=True)
         # plt.show()
 
         # Defines reporters and set up data collector
+        self.model_reports = ModelReports(self)
+        # Reporters are functions (or agents' attributes' names, None if
+        # agents do not have the attribute) rather than lambdas so that the
+        # model can be pickled (see ABM_CE_PV.snapshot)
         ABM_CE_PV_model_reporters = {
-            "Year": lambda c:
-            self.report_output("year"),
-            "Average weight of waste": lambda c:
-            self.report_output("weight"),
-            "Agents repairing": lambda c: self.count_EoL("repairing"),
-            "Agents selling": lambda c: self.count_EoL("selling"),
-            "Agents recycling": lambda c: self.count_EoL("recycling"),
-            "Agents landfilling": lambda c: self.count_EoL("landfilling"),
-            "Agents storing": lambda c: self.count_EoL("hoarding"),
-            "Agents buying new": lambda c: self.count_EoL("buy_new"),
-            "Agents buying used": lambda c: self.count_EoL("buy_used"),
-            "Agents buying certified": lambda c: self.count_EoL("certified"),
-            "Total product": lambda c:
-            self.report_output("product_stock"),
-            "New product": lambda c:
-            self.report_output("product_stock_new"),
-            "Used product": lambda c:
-            self.report_output("product_stock_used"),
-            "New product_mass": lambda c:
-            self.report_output("prod_stock_new_mass"),
-            "Used product_mass": lambda c:
-            self.report_output("prod_stock_used_mass"),
-            "End-of-life - repaired": lambda c:
-            self.report_output("product_repaired"),
-            "End-of-life - sold": lambda c: self.report_output("product_sold"),
-            "End-of-life - recycled": lambda c:
-            self.report_output("product_recycled"),
-            "End-of-life - landfilled": lambda c:
-            self.report_output("product_landfilled"),
-            "End-of-life - stored": lambda c:
-            self.report_output("product_hoarded"),
-            "eol - new repaired weight": lambda c:
-            self.report_output("product_new_repaired"),
-            "eol - new sold weight": lambda c:
-            self.report_output("product_new_sold"),
-            "eol - new recycled weight": lambda c:
-            self.report_output("product_new_recycled"),
-            "eol - new landfilled weight": lambda c:
-            self.report_output("product_new_landfilled"),
-            "eol - new stored weight": lambda c:
-            self.report_output("product_new_hoarded"),
-            "eol - used repaired weight": lambda c:
-            self.report_output("product_used_repaired"),
-            "eol - used sold weight": lambda c:
-            self.report_output("product_used_sold"),
-            "eol - used recycled weight": lambda c:
-            self.report_output("product_used_recycled"),
-            "eol - used landfilled weight": lambda c:
-            self.report_output("product_used_landfilled"),
-            "eol - used stored weight": lambda c:
-            self.report_output("product_used_hoarded"),
-            "Average landfilling cost": lambda c:
-            self.report_output("average_landfill_cost"),
-            "Average storing cost": lambda c:
-            self.report_output("average_hoarding_cost"),
-            "Average recycling cost": lambda c:
-            self.report_output("average_recycling_cost"),
-            "Average repairing cost": lambda c:
-            self.report_output("average_repairing_cost"),
-            "Average selling cost": lambda c:
-            self.report_output("average_second_hand_price"),
-            "Recycled material volume": lambda c:
-            self.report_output("recycled_mat_volume"),
-            "Recycled material value": lambda c:
-            self.report_output("recycled_mat_value"),
-            "Producer costs": lambda c:
-            self.report_output("producer_costs"),
-            "Consumer costs": lambda c:
-            self.report_output("consumer_costs"),
-            "Recycler costs": lambda c:
-            self.report_output("recycler_costs"),
-            "Refurbisher costs": lambda c:
-            self.report_output("refurbisher_costs"),
-            "Refurbisher costs w margins": lambda c:
-            self.report_output("refurbisher_costs_w_margins")}
-
-        ABM_CE_PV_agent_reporters = {
-            "Year": lambda c:
-            self.report_output("year"),
-            "Number_product_repaired":
-                lambda a: getattr(a, "number_product_repaired", None),
-            "Number_product_sold":
-                lambda a: getattr(a, "number_product_sold", None),
-            "Number_product_recycled":
-                lambda a: getattr(a, "number_product_recycled", None),
-            "Number_product_landfilled":
-                lambda a: getattr(a, "number_product_landfilled", None),
-            "Number_product_hoarded":
-                lambda a: getattr(a, "number_product_hoarded", None),
-            "Recycling":
-                lambda a: getattr(a, "EoL_pathway", None),
-            "Landfilling costs":
-                lambda a: getattr(a, "landfill_cost", None),
-            "Storing costs":
-                lambda a: getattr(a, "hoarding_cost", None),
-            "Recycling costs":
-                lambda a: getattr(a, "recycling_cost", None),
-            "Repairing costs":
-                lambda a: getattr(a, "repairing_cost", None),
-            "Selling costs":
-                lambda a: getattr(a, "scd_hand_price", None),
-            "Material produced":
-                lambda a: getattr(a, "material_produced", None),
-            "Recycled volume":
-                lambda a: getattr(a, "recycled_material_volume", None),
-            "Recycled value":
-                lambda a: getattr(a, "recycled_material_value", None),
+            "Year": partial(ABM_CE_PV.report_output, condition="year"),
+            "Average weight of waste":
+                partial(ABM_CE_PV.report_output, condition="weight"),
+            "Agents repairing":
+                partial(ABM_CE_PV.count_EoL, condition="repairing"),
+            "Agents selling":
+                partial(ABM_CE_PV.count_EoL, condition="selling"),
+            "Agents recycling":
+                partial(ABM_CE_PV.count_EoL, condition="recycling"),
+            "Agents landfilling":
+                partial(ABM_CE_PV.count_EoL, condition="landfilling"),
+            "Agents storing":
+                partial(ABM_CE_PV.count_EoL, condition="hoarding"),
+            "Agents buying new":
+                partial(ABM_CE_PV.count_EoL, condition="buy_new"),
+            "Agents buying used":
+                partial(ABM_CE_PV.count_EoL, condition="buy_used"),
+            "Agents buying certified":
+                partial(ABM_CE_PV.count_EoL, condition="certified"),
+            "Total product":
+                partial(ABM_CE_PV.report_output, condition="product_stock"),
+            "New product":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_stock_new"),
+            "Used product":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_stock_used"),
+            "New product_mass":
+                partial(ABM_CE_PV.report_output,
+                        condition="prod_stock_new_mass"),
+            "Used product_mass":
+                partial(ABM_CE_PV.report_output,
+                        condition="prod_stock_used_mass"),
+            "End-of-life - repaired":
+                partial(ABM_CE_PV.report_output, condition="product_repaired"),
+            "End-of-life - sold":
+                partial(ABM_CE_PV.report_output, condition="product_sold"),
+            "End-of-life - recycled":
+                partial(ABM_CE_PV.report_output, condition="product_recycled"),
+            "End-of-life - landfilled":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_landfilled"),
+            "End-of-life - stored":
+                partial(ABM_CE_PV.report_output, condition="product_hoarded"),
+            "eol - new repaired weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_repaired"),
+            "eol - new sold weight":
+                partial(ABM_CE_PV.report_output, condition="product_new_sold"),
+            "eol - new recycled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_recycled"),
+            "eol - new landfilled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_landfilled"),
+            "eol - new stored weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_new_hoarded"),
+            "eol - used repaired weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_repaired"),
+            "eol - used sold weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_sold"),
+            "eol - used recycled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_recycled"),
+            "eol - used landfilled weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_landfilled"),
+            "eol - used stored weight":
+                partial(ABM_CE_PV.report_output,
+                        condition="product_used_hoarded"),
+            "Average landfilling cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_landfill_cost"),
+            "Average storing cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_hoarding_cost"),
+            "Average recycling cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_recycling_cost"),
+            "Average repairing cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_repairing_cost"),
+            "Average selling cost":
+                partial(ABM_CE_PV.report_output,
+                        condition="average_second_hand_price"),
+            "Recycled material volume":
+                partial(ABM_CE_PV.report_output,
+                        condition="recycled_mat_volume"),
+            "Recycled material value":
+                partial(ABM_CE_PV.report_output,
+                        condition="recycled_mat_value"),
             "Producer costs":
-                lambda a: getattr(a, "producer_costs", None),
+                partial(ABM_CE_PV.report_output, condition="producer_costs"),
             "Consumer costs":
-                lambda a: getattr(a, "consumer_costs", None),
+                partial(ABM_CE_PV.report_output, condition="consumer_costs"),
             "Recycler costs":
-                lambda a: getattr(a, "recycler_costs", None),
+                partial(ABM_CE_PV.report_output, condition="recycler_costs"),
             "Refurbisher costs":
-                lambda a: getattr(a, "refurbisher_costs", None)}
+                partial(ABM_CE_PV.report_output,
+                        condition="refurbisher_costs"),
+            "Refurbisher costs w margins":
+                partial(ABM_CE_PV.report_output,
+                        condition="refurbisher_costs_w_margins")}
+
+        ABM_CE_PV_agent_reporters = {
+            "Year":
+                partial(ABM_CE_PV.report_agent_output, condition="year"),
+            "Number_product_repaired": "number_product_repaired",
+            "Number_product_sold": "number_product_sold",
+            "Number_product_recycled": "number_product_recycled",
+            "Number_product_landfilled": "number_product_landfilled",
+            "Number_product_hoarded": "number_product_hoarded",
+            "Recycling": "EoL_pathway",
+            "Landfilling costs": "landfill_cost",
+            "Storing costs": "hoarding_cost",
+            "Recycling costs": "recycling_cost",
+            "Repairing costs": "repairing_cost",
+            "Selling costs": "scd_hand_price",
+            "Material produced": "material_produced",
+            "Recycled volume": "recycled_material_volume",
+            "Recycled value": "recycled_material_value",
+            "Producer costs": "producer_costs",
+            "Consumer costs": "consumer_costs",
+            "Recycler costs": "recycler_costs",
+            "Refurbisher costs": "refurbisher_costs"}
 
         self.datacollector = DataCollector(
             model_reporters=ABM_CE_PV_model_reporters,
             agent_reporters=ABM_CE_PV_agent_reporters)
 
+        # Phases of each step, in order (see ABM_CE_PV.step), and time spent
+        # in each phase (s)
+        self.phases = {
+            "collect": self.collect_data,
+            "product_market": self.update_product_market,
+            "aggregation": self.aggregate_consumers,
+            "consumers": self.step_consumers,
+            "recycled_waste": self.aggregate_recycled_waste,
+            "recyclers": partial(self.schedule.step_type, "recyclers"),
+            "industrial_waste": self.material_flows.update_industrial_waste,
+            "trust": self.update_producers_trust,
+            "producers": partial(self.schedule.step_type, "producers"),
+            "refurbishers": partial(self.schedule.step_type, "refurbishers"),
+            "producer_recovery": self.recover_materials,
+            "cost_accounting": self.account_costs}
+        self.phase_times = dict.fromkeys(self.phases, 0)
+
     def shortest_paths(self, target_states, distances_to_target):
         """
-        Compute shortest paths between chosen origin states and targets with
-        the Dijkstra algorithm.
-        """
-        for i in self.states_graph.nodes:
-            shortest_paths = []
-            for j in target_states:
-                shortest_paths.append(
-                    nx.shortest_path_length(self.states_graph, source=i,
-                                            target=j, weight='weight',
-                                            method='dijkstra'))
-            shortest_paths_closest_target = min(shortest_paths)
-            if shortest_paths_closest_target == 0:
-                shortest_paths_closest_target = self.mean_distance_within_state
-            distances_to_target.append(shortest_paths_closest_target)
+        Compute shortest paths between chosen origin states and targets from
+        the all-pairs shortest distance matrix (Dijkstra algorithm).
+        """
+        shortest_paths_closest_target = self.state_distances[
+            :, [self.state_index[j] for j in target_states]].min(axis=1)
+        shortest_paths_closest_target[shortest_paths_closest_target == 0] = \
+            self.mean_distance_within_state
+        distances_to_target.extend(shortest_paths_closest_target.tolist())
         return distances_to_target
 
     def init_network(self, network, nodes, node_degree, rewiring_prob):
@@ -705,35 +850,37 @@ class ABM_CE_PV(Model):
             return nx.watts_strogatz_graph(nodes, node_degree, rewiring_prob)
 
     def update_dynamic_lifetime(self):
+        """
+        Add the lifetime of the cohorts of the current year to the products'
+        lifetimes (lifetimes of past cohorts do not change).
+        """
+        for cohort in range(len(self.d_product_lifetimes),
+                            len(self.total_number_product) + self.clock + 1):
+            self.d_product_lifetimes.append(self.cohort_lifetime(cohort))
+
+    def cohort_lifetime(self, cohort):
+        """
+        Compute the average lifetime of a cohort of products.
+        """
         if self.dynamic_lifetime_model["Dynamic lifetime"]:
-            self.d_product_lifetimes = [
-                self.dynamic_lifetime_model["d_lifetime_intercept"] +
-                self.dynamic_lifetime_model["d_lifetime_reg_coeff"] *
-                x for x in range(len(self.total_number_product) + self.clock
-                                 + 1)]
-        elif self.dynamic_lifetime_model["Seed"]:
-            self.d_product_lifetimes = \
-                [self.product_lifetime] * \
-                (len(self.total_number_product) + self.clock + 1)
-            if self.clock >= self.dynamic_lifetime_model["Year"]:
-                for i in range(1, self.clock + 2 -
-                               self.dynamic_lifetime_model["Year"]):
-                    self.d_product_lifetimes[-i] = \
-                        self.dynamic_lifetime_model["avg_lifetime"]
+            return self.dynamic_lifetime_model["d_lifetime_intercept"] + \
+                self.dynamic_lifetime_model["d_lifetime_reg_coeff"] * cohort
+        elif self.dynamic_lifetime_model["Seed"] and \
+                cohort >= len(self.total_number_product) + \
+                self.dynamic_lifetime_model["Year"]:
+            return self.dynamic_lifetime_model["avg_lifetime"]
         else:
-            self.d_product_lifetimes = \
-                [self.product_lifetime] * \
-                (len(self.total_number_product) + self.clock + 1)
+            return self.product_lifetime
 
     def waste_generation(self, avg_lifetime, failure_rate, num_product):
         """
         Generate waste, called by consumers and recyclers/refurbishers
-        (to get original recycling/repairing amounts).
+        (to get original recycling/repairing amounts). Failure fractions are
+        shared by cohorts with the same lifetime (see
+        ABM_CE_PV_CohortSurvival).
         """
-        correction_year = len(self.total_number_product) - 1
-        return [j * (1 - e**(-(((self.clock + (correction_year - z)) /
-                               avg_lifetime[z])**failure_rate))).real
-                for (z, j) in enumerate(num_product)]
+        return self.cohort_survival.waste_generation(
+            avg_lifetime, failure_rate, num_product)
 
     def recycling_process_change(self):
         """
@@ -775,17 +922,28 @@ class ABM_CE_PV(Model):
             product_growth_rate = self.product_growth[1]
         additional_capacity = sum(product_as_function) * product_growth_rate
         product_as_function.append(additional_capacity)
-        mass_conversion_coeffs = [
-            self.product_average_wght * e**(
-                -self.mass_to_function_reg_coeff * x) for x in
-            range(len(product_as_function))]
-        self.yearly_product_wght = mass_conversion_coeffs[-1]
+        mass_conversion_coeffs = self.extend_mass_conversion_coeffs(
+            len(product_as_function))
+        self.yearly_product_wght = \
+            mass_conversion_coeffs[len(product_as_function) - 1]
+        total_product = sum(product_as_function)
         weighted_average_mass_watt = sum(
-            [product_as_function[i] / sum(product_as_function) *
-             mass_conversion_coeffs[i] for i
-             in range(len(mass_conversion_coeffs))])
+            [product / total_product * coeff for product, coeff in
+             zip(product_as_function, mass_conversion_coeffs)])
         return weighted_average_mass_watt
 
+    def extend_mass_conversion_coeffs(self, length):
+        """
+        Extend the table of mass conversion coefficients (kg/fu) of each
+        cohort year, shared by all agents, to at least length years and
+        return it. The model from IRENA-IEA 2016 is used.
+        """
+        for x in range(len(self.mass_conversion_coeffs), length):
+            self.mass_conversion_coeffs.append(
+                self.product_average_wght * e**(
+                    -self.mass_to_function_reg_coeff * x))
+        return self.mass_conversion_coeffs
+
     def average_price_per_function_model(self):
         """
         Compute the price of first hand products. Price ratio is compared to
@@ -801,187 +959,57 @@ class ABM_CE_PV(Model):
         Count adoption in each end of life pathway. Values are then
         reported by model's reporters.
         """
-        count = 0
-        for agent in model.schedule.agents:
-            if agent.unique_id < model.num_consumers:
-                if condition == "repairing" and agent.EoL_pathway == "repair":
-                    count += 1
-                elif condition == "selling" and agent.EoL_pathway == "sell":
-                    count += 1
-                elif condition == "recycling" and \
-                        agent.EoL_pathway == "recycle":
-                    count += 1
-                elif condition == "landfilling" and \
-                        agent.EoL_pathway == "landfill":
-                    count += 1
-                elif condition == "hoarding" and agent.EoL_pathway == "hoard":
-                    count += 1
-                elif condition == "buy_new" and \
-                        agent.purchase_choice == "new":
-                    count += 1
-                elif condition == "buy_used" and \
-                        agent.purchase_choice == "used":
-                    count += 1
-                    model.consumer_used_product += 1
-                elif condition == "buy_certified" and \
-                        agent.purchase_choice == "certified":
-                    count += 1
-                else:
-                    continue
-            else:
-                continue
-        return count
+        return model.model_reports.get_eol_count(condition)
 
     def report_output(model, condition):
         """
         Count waste streams in each end of life pathway. Values are then
         reported by model's reporters.
         """
-        count = 0
-        count2 = 0
-        industrial_waste_landfill = 0
-        industrial_waste_recycled = 0
-        industrial_waste_landfill_mass = 0
-        industrial_waste_recycled_mass = 0
-        for agent in model.schedule.agents:
-            if model.num_consumers + model.num_recyclers <= agent.unique_id < \
-                    model.num_consumers + model.num_prod_n_recyc:
-                if model.epr_business_model:
-                    industrial_waste_recycled += \
-                        agent.industrial_waste_generated / model.num_consumers
-                    industrial_waste_recycled_mass += \
-                        model.yearly_product_wght * \
-                        agent.industrial_waste_generated / model.num_consumers
-                else:
-                    industrial_waste_landfill += \
-                        agent.industrial_waste_generated / model.num_consumers
-                    industrial_waste_landfill_mass += \
-                        model.yearly_product_wght * \
-                        agent.industrial_waste_generated / model.num_consumers
-        for agent in model.schedule.agents:
-            if condition == "product_stock" and agent.unique_id < \
-                    model.num_consumers:
-                count += sum(agent.number_product_hard_copy)
-            elif condition == "product_stock_new" and agent.unique_id < \
-                    model.num_consumers:
-                count += sum(agent.new_products_hard_copy)
-            if condition == "product_stock_used" and agent.unique_id < \
-                    model.num_consumers:
-                count += sum(agent.used_products_hard_copy)
-            elif condition == "prod_stock_new_mass" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.new_products_mass
-            if condition == "prod_stock_used_mass" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.used_products_mass
-            elif condition == "product_repaired" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_product_repaired
-            elif condition == "product_sold" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_product_sold
-                count2 += agent.number_product_sold
-                count2 += agent.number_product_repaired
-            elif condition == "product_recycled" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_product_recycled
-                count += industrial_waste_recycled
-            elif condition == "product_landfilled" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_product_landfilled
-                count += industrial_waste_landfill
-            elif condition == "product_hoarded" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_product_hoarded
-            elif condition == "product_new_repaired" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_new_prod_repaired
-            elif condition == "product_new_sold" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_new_prod_sold
-            elif condition == "product_new_recycled" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_new_prod_recycled
-                count += industrial_waste_recycled_mass
-            elif condition == "product_new_landfilled" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_new_prod_landfilled
-                count += industrial_waste_landfill_mass
-            elif condition == "product_new_hoarded" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_new_prod_hoarded
-            elif condition == "product_used_repaired" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_used_prod_repaired
-            elif condition == "product_used_sold" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_used_prod_sold
-            elif condition == "product_used_recycled" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_used_prod_recycled
-            elif condition == "product_used_landfilled" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_used_prod_landfilled
-            elif condition == "product_used_hoarded" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.number_used_prod_hoarded
-            elif condition == "consumer_costs" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.consumer_costs
-            elif condition == "average_landfill_cost" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.landfill_cost / model.num_consumers
-            elif condition == "average_hoarding_cost" and agent.unique_id < \
-                    model.num_consumers:
-                count += agent.hoarding_cost / model.num_consumers
-            elif condition == "average_recycling_cost" and model.num_consumers\
-                    <= agent.unique_id < model.num_consumers + \
-                    model.num_recyclers:
-                count += agent.recycling_cost / model.num_recyclers
-            elif condition == "average_repairing_cost" and model.num_consumers\
-                    + model.num_prod_n_recyc <= agent.unique_id:
-                count += agent.repairing_cost / model.num_refurbishers
-            elif condition == "average_second_hand_price" and \
-                    model.num_consumers + model.num_prod_n_recyc <= \
-                    agent.unique_id:
-                count += (-1 * agent.scd_hand_price) / model.num_refurbishers
-            elif condition == "year":
-                count = 2020 + model.clock
-            elif condition == "weight":
-                count = model.dynamic_product_average_wght
-            elif condition == "recycled_mat_volume" and model.num_consumers + \
-                    model.num_recyclers <= agent.unique_id < \
-                    model.num_consumers + model.num_prod_n_recyc:
-                if not np.isnan(agent.recycled_material_volume):
-                    count += agent.recycled_material_volume
-            elif condition == "recycled_mat_value" and model.num_consumers + \
-                    model.num_recyclers <= agent.unique_id < \
-                    model.num_consumers + model.num_prod_n_recyc:
-                if not np.isnan(agent.recycled_material_value):
-                    count += agent.recycled_material_value
-            elif condition == "producer_costs" and model.num_consumers + \
-                    model.num_recyclers <= agent.unique_id < \
-                    model.num_consumers + model.num_prod_n_recyc:
-                count += agent.producer_costs
-            elif condition == "recycler_costs" and model.num_consumers <= \
-                    agent.unique_id < model.num_consumers + \
-                    model.num_recyclers:
-                count += agent.recycler_costs
-            elif condition == "refurbisher_costs" and model.num_consumers + \
-                    model.num_prod_n_recyc <= agent.unique_id:
-                count += agent.refurbisher_costs
-            elif condition == "refurbisher_costs_w_margins" and model.num_consumers + \
-                    model.num_prod_n_recyc <= agent.unique_id:
-                count += agent.refurbisher_costs_w_margins
-        if condition == "product_sold":
-            model.sold_repaired_waste += count2 - \
-                                         model.past_sold_repaired_waste
-            model.past_sold_repaired_waste = count2
-        return count
+        return model.model_reports.get_output(condition)
 
-    def step(self):
+    def report_agent_output(agent, condition):
+        """
+        Report model's outputs (e.g., the year) for each agent. Values are
+        then reported by agents' reporters.
+        """
+        return agent.model.report_output(condition)
+
+    def snapshot(self):
+        """
+        Return the full state of the model (agents, networks, data collector
+        and states of the random number generators) serialized as bytes, to
+        be restored with ABM_CE_PV.restore (e.g., to branch scenarios from a
+        common prefix, see ABM_CE_PV_ScenarioTree).
+        """
+        return pickle.dumps((self, random.getstate(), np.random.get_state()),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def restore(snapshot):
+        """
+        Return the model of a snapshot (see ABM_CE_PV.snapshot) and set the
+        random number generators to their state when the snapshot was taken.
+        """
+        model, random_state, np_random_state = pickle.loads(snapshot)
+        random.setstate(random_state)
+        np.random.set_state(np_random_state)
+        return model
+
+    def update_second_hand_market(self):
+        """
+        Update the number of consumers buying used products and the volume of
+        products sold and repaired by consumers that is available to them.
+        """
+        self.consumer_used_product = \
+            self.model_reports.get_eol_count("buy_used")
+        self.sold_repaired_waste += self.model_reports.sold_repaired - \
+            self.past_sold_repaired_waste
+        self.past_sold_repaired_waste = self.model_reports.sold_repaired
+
+    def collect_data(self):
         """
-        Advance the model by one step and collect data.
+        Reset yearly totals, update reports and collect data.
         """
         self.total_waste = 0
         self.total_yearly_new_products = 0
@@ -990,10 +1018,82 @@ class ABM_CE_PV(Model):
         self.dynamic_product_average_wght = \
             self.average_mass_per_function_model(
                 self.copy_total_number_product)
-        # Collect data
+        self.model_reports.update()
+        self.update_second_hand_market()
         self.datacollector.collect(self)
-        # Refers to agent step function
+
+    def update_product_market(self):
+        """
+        Update product lifetime and price.
+        """
         self.update_dynamic_lifetime()
         self.average_price_per_function_model()
-        self.schedule.step()
+
+    def aggregate_consumers(self):
+        """
+        Compute the population totals and neighbors' choices read by
+        consumers during their decisions.
+        """
+        self.consumer_aggregates.reset()
+        if self.engine != "vectorized":
+            self.subjective_norm.reset()
+
+    def step_consumers(self):
+        """
+        Step all consumers.
+        """
+        if self.engine == "vectorized":
+            self.consumer_store.step()
+            self.customer_index.update_pathways()
+        else:
+            self.schedule.step_type("consumers")
+
+    def aggregate_recycled_waste(self):
+        """
+        Update consumers' amount of recycled waste and the sums over
+        recyclers' catchments, before recyclers step.
+        """
+        for agent in self.consumers:
+            agent.update_yearly_recycled_waste(False)
+        self.customer_index.update_catchments()
+
+    def update_producers_trust(self):
+        """
+        Update trust of all producers at once when trust_update is "batched",
+        before producers step.
+        """
+        if self.trust_update == "batched" and (
+                not all(self.established_scd_mkt.values()) or
+                not self.industrial_symbiosis):
+            self.trust_network.update_producers()
+
+    def recover_materials(self):
+        """
+        Update amount recycled after refurbishers make their decision
+        regarding waste sold to them, and materials recovered by producers.
+        """
+        for agent in self.consumers:
+            agent.update_yearly_recycled_waste(True)
+        self.accounting.update_recycled_volumes()
+        self.material_flows.update_recovered_volumes()
+
+    def account_costs(self):
+        """
+        Compute societal costs of producers and recyclers.
+        """
+        self.material_flows.update_costs()
+        for agent in self.recyclers:
+            agent.compute_recycler_costs()
+
+    def step(self):
+        """
+        Advance the model by one step and collect data. The step runs each
+        phase of self.phases in order, a phase may be replaced (e.g., by a
+        batched implementation) by assigning another function to its name.
+        """
+        for name, phase in self.phases.items():
+            start = time.perf_counter()
+            phase()
+            self.phase_times[name] += time.perf_counter() - start
+        self.schedule.advance()
         self.clock = self.clock + 1
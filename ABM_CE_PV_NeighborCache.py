@@ -0,0 +1,57 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - neighbors of each node of the model's network
+"""
+
+from itertools import chain
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class NeighborCache:
+    """
+    Compressed sparse row (CSR) adjacency of the model's network (model.G)
+    and cached neighbors of each node. The network does not change once
+    agents are placed on it, so it is frozen and the neighbor lists (and
+    the agents on those nodes) are built once instead of at each call to
+    model.grid.get_neighbors and model.grid.get_cell_list_contents.
+    Neighbors are listed in the order of model.grid.get_neighbors (and
+    agents in the order of model.grid.get_cell_list_contents).
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        indptr (array of the positions in indices of each node's neighbors)
+        indices (array of all nodes' neighbors)
+        neighbors (list of the list of each node's neighbors)
+        neighbor_agents (list of the list of agents on each node's neighbors)
+
+    """
+
+    def __init__(self, model):
+        """
+        Creation of the cache from the model's network, once all agents are
+        placed on the network
+        """
+        self.model = model
+        graph = nx.freeze(model.G)
+        self.neighbors = [list(graph.neighbors(node)) for node in
+                          range(graph.number_of_nodes())]
+        self.indptr = np.zeros(len(self.neighbors) + 1, dtype=int)
+        np.cumsum([len(x) for x in self.neighbors], out=self.indptr[1:])
+        self.indices = np.fromiter(chain.from_iterable(self.neighbors),
+                                   dtype=int, count=self.indptr[-1])
+        self.neighbor_agents = [
+            model.grid.get_cell_list_contents(x) for x in self.neighbors]
+
+    def adjacency(self, first_node, last_node):
+        """
+        Return the sparse adjacency matrix of nodes first_node to last_node
+        (excluded).
+        """
+        num_nodes = len(self.neighbors)
+        matrix = csr_matrix((np.ones(len(self.indices)), self.indices,
+                             self.indptr), shape=(num_nodes, num_nodes))
+        return matrix[first_node:last_node, first_node:last_node]
@@ -0,0 +1,161 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - random number streams of agents and stochastic processes
+"""
+
+import random
+import zlib
+import numpy as np
+
+
+class GlobalStream:
+    """
+    Random numbers drawn from the global generators (numpy.random and
+    random), shared by all agents and stochastic processes in the order of
+    their draws.
+
+    Attributes:
+        random_state (None, scipy.stats distributions draw from
+            numpy.random)
+
+    """
+
+    random_state = None
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        """
+        Draw from a uniform distribution.
+        """
+        return np.random.uniform(low, high, size)
+
+    def random(self, size=None):
+        """
+        Draw from a uniform distribution over [0, 1).
+        """
+        return np.random.random(size)
+
+    def triangular(self, left, mode, right, size=None):
+        """
+        Draw from a triangular distribution.
+        """
+        return np.random.triangular(left, mode, right, size)
+
+    def randrange(self, stop):
+        """
+        Draw an integer from range(stop).
+        """
+        return random.randrange(stop)
+
+    def choice(self, seq):
+        """
+        Draw an element of a sequence.
+        """
+        return random.choice(seq)
+
+    def shuffle(self, x):
+        """
+        Shuffle a list in place.
+        """
+        random.shuffle(x)
+
+
+class Stream(GlobalStream):
+    """
+    Random numbers drawn from the stream's own generator.
+
+    Attributes:
+        random_state (numpy random generator of the stream)
+
+    """
+
+    def __init__(self, seed_sequence):
+        """
+        Creation of the stream from its seed sequence
+        """
+        self.random_state = np.random.default_rng(seed_sequence)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        """
+        Draw from a uniform distribution.
+        """
+        return self.random_state.uniform(low, high, size)
+
+    def random(self, size=None):
+        """
+        Draw from a uniform distribution over [0, 1).
+        """
+        return self.random_state.random(size)
+
+    def triangular(self, left, mode, right, size=None):
+        """
+        Draw from a triangular distribution.
+        """
+        return self.random_state.triangular(left, mode, right, size)
+
+    def randrange(self, stop):
+        """
+        Draw an integer from range(stop).
+        """
+        return int(self.random_state.integers(stop))
+
+    def choice(self, seq):
+        """
+        Draw an element of a sequence.
+        """
+        return seq[int(self.random_state.integers(len(seq)))]
+
+    def shuffle(self, x):
+        """
+        Shuffle a list in place.
+        """
+        self.random_state.shuffle(x)
+
+
+class RandomStreams:
+    """
+    Random number streams of the model's stochastic processes (e.g.,
+    "attributes", "knowledge", "social_events" or "tie_breaking"), one per
+    process and agent. Without common random numbers, all streams are the
+    global generators, seeded by the model. With common random numbers,
+    each process of each agent has its own generator, derived from the seed
+    with numpy.random.SeedSequence (spawn key of the process's name and the
+    agent's unique_id), so that paired scenarios (e.g., with another
+    recycling process) draw the same random numbers for the same agent and
+    process even when their decisions differ.
+
+    Attributes:
+        common_random_numbers (boolean), (default=False). Modeler's choice.
+        seed_sequence (numpy SeedSequence of the model's seed)
+        streams (dictionary of processes and agents' unique_id, and their
+            streams)
+
+    """
+
+    def __init__(self, seed, common_random_numbers=False):
+        """
+        Creation of the random streams
+        """
+        self.common_random_numbers = common_random_numbers
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.streams = {}
+
+    def stream(self, process, unique_id=None):
+        """
+        Return the stream of a process of an agent (or of the model if
+        unique_id is None).
+        """
+        if not self.common_random_numbers:
+            return GLOBAL_STREAM
+        key = (process, unique_id)
+        if key not in self.streams:
+            spawn_key = (zlib.crc32(process.encode()),)
+            if unique_id is not None:
+                spawn_key += (unique_id,)
+            self.streams[key] = Stream(np.random.SeedSequence(
+                self.seed_sequence.entropy, spawn_key=spawn_key))
+        return self.streams[key]
+
+
+GLOBAL_STREAM = GlobalStream()
@@ -8,7 +8,6 @@ Agent - Recycler
 """
 
 from mesa import Agent
-import numpy as np
 
 
 class Recyclers(Agent):
@@ -26,19 +25,23 @@ class Recyclers(Agent):
             et al 2018 and European Commission (2015).
         recycling_learning_shape_factor, (default=-0.39). From Qiu & Suh 2019.
         social_influencability_boundaries (from Ghali et al. 2017)
+        attributes (dictionary of the agent's randomly drawn attributes, see
+            Recyclers.draw_attributes), (default=None, attributes are drawn
+            when the agent is created). Drawn in bulk by AgentFactory.
 
     """
 
     def __init__(self, unique_id, model, original_recycling_cost,
                  init_eol_rate, recycling_learning_shape_factor,
-                 social_influencability_boundaries):
+                 social_influencability_boundaries, attributes=None):
         """
         Creation of new recycler agent
         """
         super().__init__(unique_id, model)
-        self.original_recycling_cost = np.random.triangular(
-            original_recycling_cost[0], original_recycling_cost[2],
-            original_recycling_cost[1])
+        if attributes is None:
+            attributes = self.draw_attributes(
+                original_recycling_cost, social_influencability_boundaries)
+        self.original_recycling_cost = attributes["original_recycling_cost"]
         self.original_fraction_recycled_waste = init_eol_rate["recycle"]
         self.recycling_learning_shape_factor = recycling_learning_shape_factor
         self.recycling_cost = self.original_recycling_cost
@@ -57,17 +60,35 @@ class Recyclers(Agent):
             sum(self.model.waste_generation(self.model.d_product_lifetimes,
                                             self.model.avg_failure_rate[2],
                                             original_recycled_volumes))
-        self.social_influencability = np.random.uniform(
-            social_influencability_boundaries[0],
-            social_influencability_boundaries[1])
-        self.knowledge = np.random.random()
-        self.social_interactions = np.random.random()
-        self.knowledge_learning = np.random.random()
+        self.social_influencability = attributes["social_influencability"]
+        self.knowledge = attributes["knowledge"]
+        self.social_interactions = attributes["social_interactions"]
+        self.knowledge_learning = attributes["knowledge_learning"]
         self.knowledge_t = self.knowledge
         self.symbiosis = False
         self.agent_i = self.unique_id - self.model.num_consumers
         self.recycler_costs = 0
 
+    def draw_attributes(self, original_recycling_cost,
+                        social_influencability_boundaries):
+        """
+        Draw the agent's random attributes (see AgentFactory.recyclers for the
+        same attributes drawn in bulk).
+        """
+        stream = self.model.random_streams.stream("attributes",
+                                                  self.unique_id)
+        attributes = {}
+        attributes["original_recycling_cost"] = stream.triangular(
+            original_recycling_cost[0], original_recycling_cost[2],
+            original_recycling_cost[1])
+        attributes["social_influencability"] = stream.uniform(
+            social_influencability_boundaries[0],
+            social_influencability_boundaries[1])
+        attributes["knowledge"] = stream.random()
+        attributes["social_interactions"] = stream.random()
+        attributes["knowledge_learning"] = stream.random()
+        return attributes
+
     def update_transport_recycling_costs(self):
         """
         Update transportation costs according to the (evolving) mass of waste.
@@ -80,15 +101,6 @@ class Recyclers(Agent):
             self.model.transportation_cost / 1E3 * \
             self.model.mn_mx_av_distance_to_recycler[2]
 
-    def update_recycled_waste(self):
-        """
-        Update consumers' amount of recycled waste.
-        """
-        if self.unique_id == self.model.num_consumers:
-            for agent in self.model.schedule.agents:
-                if agent.unique_id < self.model.num_consumers:
-                    agent.update_yearly_recycled_waste(False)
-
     def triage(self):
         """
         Evaluate amount of products that can be refurbished
@@ -97,40 +109,24 @@ class Recyclers(Agent):
         self.recycling_volume = 0
         self.repairable_volume = 0
         self.total_repairable_volume = 0
-        tot_waste_sold = 0
-        new_installed_capacity = 0
-        for agent in self.model.schedule.agents:
-            if agent.unique_id < self.model.num_consumers and \
-                    agent.EoL_pathway == "sell":
-                tot_waste_sold += agent.number_product_EoL
-            if agent.unique_id < self.model.num_consumers and \
-                    agent.purchase_choice == "used":
-                new_installed_capacity += agent.number_product[-1]
+        customer_index = self.model.customer_index
+        tot_waste_sold = customer_index.waste_sold
+        new_installed_capacity = customer_index.used_installed_capacity
         used_vol_purchased = self.model.consumer_used_product \
             / self.model.num_consumers * new_installed_capacity
         tot_waste_sold += self.model.yearly_repaired_waste
-        if tot_waste_sold < used_vol_purchased:
-            for agent in self.model.schedule.agents:
-                if agent.unique_id < self.model.num_consumers and \
-                        agent.recycling_facility_id == self.unique_id:
-                    self.recycler_total_volume += agent.yearly_recycled_waste
-                    if self.model.yearly_repaired_waste < \
-                            self.model.repairability * self.model.total_waste:
-                        self.recycling_volume = \
-                            (1 - self.model.repairability) * \
-                            self.recycler_total_volume
-                        self.repairable_volume = self.recycler_total_volume - \
-                            self.recycling_volume
-                    else:
-                        self.recycling_volume = self.recycler_total_volume
-                        self.repairable_volume = 0
+        self.recycler_total_volume = \
+            customer_index.catchment_recycled_waste[self.agent_i]
+        if tot_waste_sold < used_vol_purchased and \
+                self.model.yearly_repaired_waste < \
+                self.model.repairability * self.model.total_waste:
+            self.recycling_volume = (1 - self.model.repairability) * \
+                self.recycler_total_volume
+            self.repairable_volume = self.recycler_total_volume - \
+                self.recycling_volume
         else:
-            for agent in self.model.schedule.agents:
-                if agent.unique_id < self.model.num_consumers and \
-                        agent.recycling_facility_id == self.unique_id:
-                    self.recycler_total_volume += agent.yearly_recycled_waste
-                    self.recycling_volume = self.recycler_total_volume
-                    self.repairable_volume = 0
+            self.recycling_volume = self.recycler_total_volume
+            self.repairable_volume = 0
         self.model.recycler_repairable_waste += self.repairable_volume
         self.total_repairable_volume += self.repairable_volume
         self.model.yearly_repaired_waste += self.repairable_volume
@@ -156,12 +152,12 @@ class Recyclers(Agent):
         Update knowledge of agents about industrial symbiosis. Mathematical
         model adapted from Ghali et al. 2017.
         """
-        self.knowledge_learning = np.random.random()
+        stream = self.model.random_streams.stream("knowledge",
+                                                  self.unique_id)
+        self.knowledge_learning = stream.random()
         knowledge_neighbors = 0
-        neighbors_nodes = self.model.grid.get_neighbors(self.pos,
-                                                        include_center=False)
-        for agent in self.model.grid.get_cell_list_contents(neighbors_nodes):
-            self.social_interactions = np.random.random()
+        for agent in self.model.neighbor_cache.neighbor_agents[self.pos]:
+            self.social_interactions = stream.random()
             agent_j = agent.unique_id - self.model.num_consumers
             if self.model.trust_prod[self.agent_i, agent_j] >= \
                     self.model.trust_threshold:
@@ -181,15 +177,7 @@ class Recyclers(Agent):
         recovered and the costs of recycling processes. Sales revenue of
         repairable products are not included.
         """
-        revenue = 0
-        for agent in self.model.schedule.agents:
-            if self.model.num_consumers + self.model.num_recyclers <= \
-                    agent.unique_id < self.model.num_consumers + \
-                    self.model.num_prod_n_recyc:
-                if not np.isnan(agent.yearly_recycled_material_volume) and \
-                        not np.isnan(agent.recycled_mat_price):
-                    revenue += agent.yearly_recycled_material_volume * \
-                               agent.recycled_mat_price
+        revenue = self.model.material_flows.material_revenue
         revenue /= self.model.num_recyclers
         self.recycler_costs += \
             ((self.recycling_volume + self.model.installer_recycled_amount) *
@@ -199,7 +187,6 @@ class Recyclers(Agent):
         """
         Evolution of agent at each step
         """
-        self.update_recycled_waste()
         self.triage()
         self.recycling_cost = self.learning_curve_function(
             self.original_recycling_volume, self.recycling_volume,
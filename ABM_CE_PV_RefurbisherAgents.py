@@ -8,7 +8,6 @@ Agent - Refurbisher
 """
 
 from mesa import Agent
-import numpy as np
 from ABM_CE_PV_RecyclerAgents import Recyclers
 import operator
 from scipy.stats import truncnorm
@@ -36,20 +35,25 @@ class Refurbishers(Agent):
             & Aykaç 2008 and www.investopedia.com (accessed 03/2020).
         max_storage (a list for a triangular distribution) (years), (default=
             [1, 8, 4]). From Wilson et al. 2017.
+        attributes (dictionary of the agent's randomly drawn attributes, see
+            Refurbishers.draw_attributes), (default=None, attributes are drawn
+            when the agent is created). Drawn in bulk by AgentFactory.
 
     """
 
     def __init__(self, unique_id, model, original_repairing_cost,
                  init_eol_rate, repairing_learning_shape_factor,
-                 scndhand_mkt_pric_rate, refurbisher_margin, max_storage):
+                 scndhand_mkt_pric_rate, refurbisher_margin, max_storage,
+                 attributes=None):
         """
         Creation of new refurbisher agent
         """
         super().__init__(unique_id, model)
-        self.original_repairing_cost = \
-            np.random.triangular(original_repairing_cost[0],
-                                 original_repairing_cost[2],
-                                 original_repairing_cost[1])
+        if attributes is None:
+            attributes = self.draw_attributes(
+                original_repairing_cost, scndhand_mkt_pric_rate,
+                refurbisher_margin, max_storage)
+        self.original_repairing_cost = attributes["original_repairing_cost"]
         original_reused_volumes = [x / model.num_refurbishers * 1E6 for x
                                    in model.original_num_prod]
         #  Original repairing volume is based on previous years EoL volume
@@ -67,17 +71,9 @@ class Refurbishers(Agent):
          #   np.random.triangular(scndhand_mkt_pric_rate[0],
           #                       scndhand_mkt_pric_rate[2],
            #                      scndhand_mkt_pric_rate[1])
-        self.scndhand_mkt_pric_rate = \
-            float(truncnorm((0.11 - scndhand_mkt_pric_rate[0]) /
-                            scndhand_mkt_pric_rate[1],
-                            (1.14 - scndhand_mkt_pric_rate[0]) /
-                            scndhand_mkt_pric_rate[1],
-                            scndhand_mkt_pric_rate[0],
-                            scndhand_mkt_pric_rate[1]).rvs(1))
+        self.scndhand_mkt_pric_rate = attributes["scndhand_mkt_pric_rate"]
         # attitude_level = float(distribution.rvs(1))
-        self.refurbisher_margin = np.random.triangular(
-            refurbisher_margin[0], refurbisher_margin[2],
-            refurbisher_margin[1])
+        self.refurbisher_margin = attributes["refurbisher_margin"]
         self.scd_hand_price = self.scndhand_mkt_pric_rate * \
             self.model.fsthand_mkt_pric
         self.count_consumers = 0
@@ -85,8 +81,7 @@ class Refurbishers(Agent):
         self.storage_decision = False
         self.storage_yr = 0
         self.storage_yr_recycle = 0
-        self.max_storage_ref = np.random.triangular(
-            max_storage[0], max_storage[2], max_storage[1])
+        self.max_storage_ref = attributes["max_storage_ref"]
         self.hoarded_waste = 0
         self.hoarded_waste_mass = 0
         self.hoarded_to_other = 0
@@ -105,20 +100,52 @@ class Refurbishers(Agent):
         self.refurbisher_costs_w_margins = 0
         self.revenue = 0
 
+    def draw_attributes(self, original_repairing_cost, scndhand_mkt_pric_rate,
+                        refurbisher_margin, max_storage):
+        """
+        Draw the agent's random attributes (see AgentFactory.refurbishers for
+        the same attributes drawn in bulk).
+        """
+        stream = self.model.random_streams.stream("attributes",
+                                                  self.unique_id)
+        attributes = {}
+        attributes["original_repairing_cost"] = \
+            stream.triangular(original_repairing_cost[0],
+                              original_repairing_cost[2],
+                              original_repairing_cost[1])
+        attributes["scndhand_mkt_pric_rate"] = \
+            float(truncnorm((0.11 - scndhand_mkt_pric_rate[0]) /
+                            scndhand_mkt_pric_rate[1],
+                            (1.14 - scndhand_mkt_pric_rate[0]) /
+                            scndhand_mkt_pric_rate[1],
+                            scndhand_mkt_pric_rate[0],
+                            scndhand_mkt_pric_rate[1]).rvs(
+                                1, random_state=stream.random_state))
+        attributes["refurbisher_margin"] = stream.triangular(
+            refurbisher_margin[0], refurbisher_margin[2],
+            refurbisher_margin[1])
+        attributes["max_storage_ref"] = stream.triangular(
+            max_storage[0], max_storage[2], max_storage[1])
+        return attributes
+
+    def customers(self, eol_pathway=None):
+        """
+        Return the refurbisher's customers, only those currently in
+        eol_pathway if given (see ABM_CE_PV_CustomerIndex).
+        """
+        return self.model.customer_index.refurbisher_customers(
+            self.unique_id, eol_pathway)
+
     def repairable_volumes(self):
         """
         Compute amount of waste that can be repaired (and thus sold).
         """
         self.refurbished_volume = 0
         total_volume_recyler = 0
-        for agent in self.model.schedule.agents:
-            if self.model.num_consumers <= agent.unique_id < \
-                    self.model.num_consumers + self.model.num_recyclers:
-                total_volume_recyler += agent.repairable_volume
-            if agent.unique_id < self.model.num_consumers:
-                if agent.refurbisher_id == self.unique_id and \
-                        agent.EoL_pathway == "repair":
-                    self.refurbished_volume += agent.number_product_EoL
+        for agent in self.model.customer_index.recyclers:
+            total_volume_recyler += agent.repairable_volume
+        for agent in self.customers("repair"):
+            self.refurbished_volume += agent.number_product_EoL
         self.refurbished_volume += total_volume_recyler / \
             self.model.num_refurbishers
         self.refurbished_volume_n_sold = self.refurbished_volume + \
@@ -142,15 +169,8 @@ class Refurbishers(Agent):
         that sells products as well as the total number of consumers assigned
         to that refurbisher.
         """
-        self.count_consumers = 0
-        self.count_consumers_tot = 0
-        for agent in self.model.schedule.agents:
-            if agent.unique_id < self.model.num_consumers:
-                if agent.refurbisher_id == self.unique_id and \
-                        agent.EoL_pathway == "sell":
-                    self.count_consumers += 1
-                if agent.refurbisher_id == self.unique_id:
-                    self.count_consumers_tot += 1
+        self.count_consumers = len(self.customers("sell"))
+        self.count_consumers_tot = len(self.customers())
 
     def refurbisher_landfill_storage(self):
         """
@@ -160,21 +180,17 @@ class Refurbishers(Agent):
         sold (either due to insufficient demand or repairs that are too costly)
         to the landfill, storage, and recycle pathways.
         """
-        for agent in self.model.schedule.agents:
-            if agent.unique_id < self.model.num_consumers:
-                if agent.refurbisher_id == self.unique_id and \
-                        agent.EoL_pathway == "sell":
-                    eol_refurbisher = \
-                        self.economic_rationale_tpb(agent, False)
-                    if eol_refurbisher == "hoard":
-                        self.storage_yr += 1
-                    volume = (agent.number_product_EoL +
-                              agent.product_storage_to_other_ref)
-                    mass_volume = agent.mass_per_function_model(agent.waste) \
-                        + agent.weighted_average_mass_watt * \
-                        agent.product_storage_to_other_ref
-                    self.update_volumes_eol(agent, eol_refurbisher,
-                                            volume, mass_volume, False)
+        for agent in self.customers("sell"):
+            eol_refurbisher = self.economic_rationale_tpb(agent, False)
+            if eol_refurbisher == "hoard":
+                self.storage_yr += 1
+            volume = (agent.number_product_EoL +
+                      agent.product_storage_to_other_ref)
+            mass_volume = agent.waste_mass + \
+                agent.waste_average_mass_watt * \
+                agent.product_storage_to_other_ref
+            self.update_volumes_eol(agent, eol_refurbisher, volume,
+                                    mass_volume, False)
 
     def storage_to_other_pathway(self):
         """
@@ -187,24 +203,20 @@ class Refurbishers(Agent):
             self.ref_hoarded_waste = 0
             hoarded_waste_copy = self.hoarded_waste
             hoarded_waste_copy_mass = self.hoarded_waste_mass
-            for agent in self.model.schedule.agents:
-                if agent.unique_id < self.model.num_consumers:
-                    if agent.refurbisher_id == self.unique_id and \
-                            agent.EoL_pathway == "sell":
-                        self.ref_hoarded_waste = min(
-                            agent.number_product_hoarded,
-                            hoarded_waste_copy / self.count_consumers)
-                        self.ref_hoarded_waste_mass = min(
-                            agent.number_new_prod_hoarded,
-                            hoarded_waste_copy_mass / self.count_consumers)
-                        eol_refurbisher_stored = \
-                            self.economic_rationale_tpb(agent, True)
-                        self.update_volumes_eol(
-                            agent, eol_refurbisher_stored,
-                            self.ref_hoarded_waste,
-                            self.ref_hoarded_waste_mass, True)
-                        self.hoarded_waste -= self.ref_hoarded_waste
-                        self.hoarded_waste_mass -= self.ref_hoarded_waste_mass
+            for agent in self.customers("sell"):
+                self.ref_hoarded_waste = min(
+                    agent.number_product_hoarded,
+                    hoarded_waste_copy / self.count_consumers)
+                self.ref_hoarded_waste_mass = min(
+                    agent.number_new_prod_hoarded,
+                    hoarded_waste_copy_mass / self.count_consumers)
+                eol_refurbisher_stored = \
+                    self.economic_rationale_tpb(agent, True)
+                self.update_volumes_eol(
+                    agent, eol_refurbisher_stored, self.ref_hoarded_waste,
+                    self.ref_hoarded_waste_mass, True)
+                self.hoarded_waste -= self.ref_hoarded_waste
+                self.hoarded_waste_mass -= self.ref_hoarded_waste_mass
 
     def economic_rationale_tpb(self, agent, storage):
         """
@@ -296,16 +308,13 @@ class Refurbishers(Agent):
                                    self.model.num_consumers
         mass_volume_recycler = self.sold_waste_recycler * \
                                self.model.dynamic_product_average_wght
-        for agent in self.model.schedule.agents:
-            if agent.unique_id < self.model.num_consumers:
-                if agent.refurbisher_id == self.unique_id:
-                    eol_ref_recycled_vol = \
-                        self.economic_rationale_tpb(agent, False)
-                    if eol_ref_recycled_vol == "hoard":
-                        self.storage_yr_recycle += 1
-                    self.update_volumes_eol_recycled(
-                        agent, eol_ref_recycled_vol, self.sold_waste_recycler,
-                        mass_volume_recycler, False)
+        for agent in self.customers():
+            eol_ref_recycled_vol = self.economic_rationale_tpb(agent, False)
+            if eol_ref_recycled_vol == "hoard":
+                self.storage_yr_recycle += 1
+            self.update_volumes_eol_recycled(
+                agent, eol_ref_recycled_vol, self.sold_waste_recycler,
+                mass_volume_recycler, False)
 
     def storage_to_other_pathway_recycler(self):
         """
@@ -318,22 +327,20 @@ class Refurbishers(Agent):
             self.ref_hoarded_waste = 0
             hoarded_waste_copy = self.hoarded_waste_recycle
             hoarded_waste_copy_mass = self.hoarded_waste_recycle_mass
-            for agent in self.model.schedule.agents:
-                if agent.unique_id < self.model.num_consumers:
-                    if agent.refurbisher_id == self.unique_id:
-                        self.ref_hoarded_waste = \
-                            hoarded_waste_copy / self.count_consumers_tot
-                        self.ref_hoarded_waste_mass = \
-                            hoarded_waste_copy_mass / self.count_consumers_tot
-                        eol_ref_recycled_vol_stored = \
-                            self.economic_rationale_tpb(agent, True)
-                        self.update_volumes_eol_recycled(
-                            agent, eol_ref_recycled_vol_stored,
-                            self.ref_hoarded_waste,
-                            self.ref_hoarded_waste_mass, True)
-                        self.hoarded_waste_recycle -= self.ref_hoarded_waste
-                        self.hoarded_waste_recycle_mass -= \
-                            self.ref_hoarded_waste_mass
+            for agent in self.customers():
+                self.ref_hoarded_waste = \
+                    hoarded_waste_copy / self.count_consumers_tot
+                self.ref_hoarded_waste_mass = \
+                    hoarded_waste_copy_mass / self.count_consumers_tot
+                eol_ref_recycled_vol_stored = \
+                    self.economic_rationale_tpb(agent, True)
+                self.update_volumes_eol_recycled(
+                    agent, eol_ref_recycled_vol_stored,
+                    self.ref_hoarded_waste, self.ref_hoarded_waste_mass,
+                    True)
+                self.hoarded_waste_recycle -= self.ref_hoarded_waste
+                self.hoarded_waste_recycle_mass -= \
+                    self.ref_hoarded_waste_mass
 
     def update_volumes_eol_recycled(self, agent, eol_path, volume,
                                     mass_volume_recycler, storage):
@@ -384,51 +391,25 @@ class Refurbishers(Agent):
         Compute societal costs of refurbishers. Assume an average of all
         refurbisher's customers' characteristics when computing costs.
         """
-        for agent in self.model.schedule.agents:
-            if agent.unique_id < self.model.num_consumers and \
-                    agent.refurbisher_id == self.unique_id and \
-                    agent.EoL_pathway == "sell":
-                revenue = \
-                    -1 * self.scd_hand_price + self.repairing_cost + \
-                    agent.random_interstate_distance * \
-                    self.model.transportation_cost / 1E3 * \
-                    self.model.dynamic_product_average_wght
-                cost_recycling = agent.copy_perceived_behavioral_control[2]
-                cost_landfilling = \
-                    agent.copy_perceived_behavioral_control[3]
-                cost_hoarding = agent.copy_perceived_behavioral_control[4]
-                self.refurbisher_costs += \
-                    (revenue * self.prod_sold + cost_recycling *
-                     self.prod_recycled + cost_landfilling *
-                     self.prod_landfilled + cost_hoarding *
-                     self.prod_hoarded) / self.count_consumers
-                self.refurbisher_costs_w_margins += \
-                    (revenue * self.prod_sold * self.refurbisher_margin +
-                     cost_recycling * self.prod_recycled + cost_landfilling *
-                     self.prod_landfilled + cost_hoarding *
-                     self.prod_hoarded) / self.count_consumers
-
-    def recovered_material_volumes(self):
-        """
-        Update amount recycled after refurbishers make their decision regarding
-        waste sold to them.
-        """
-        # Last refurbisher calls producers to update amount of waste recycled
-        if self.unique_id == self.model.num_consumers + \
-                self.model.num_prod_n_recyc + self.model.num_refurbishers - 1:
-            for agent in self.model.schedule.agents:
-                if agent.unique_id < self.model.num_consumers:
-                    agent.update_yearly_recycled_waste(True)
-                if self.model.num_consumers + self.model.num_recyclers \
-                        <= agent.unique_id < self.model.num_prod_n_recyc + \
-                        self.model.num_consumers:
-                    agent.add_installer_recycled_volumes()
-                    agent.recovered_volume_n_value()
-                    agent.costs_producer()
-            for agent in self.model.schedule.agents:
-                if self.model.num_consumers <= agent.unique_id < \
-                        self.model.num_consumers + self.model.num_recyclers:
-                    agent.compute_recycler_costs()
+        for agent in self.customers("sell"):
+            revenue = \
+                -1 * self.scd_hand_price + self.repairing_cost + \
+                agent.random_interstate_distance * \
+                self.model.transportation_cost / 1E3 * \
+                self.model.dynamic_product_average_wght
+            cost_recycling = agent.copy_perceived_behavioral_control[2]
+            cost_landfilling = agent.copy_perceived_behavioral_control[3]
+            cost_hoarding = agent.copy_perceived_behavioral_control[4]
+            self.refurbisher_costs += \
+                (revenue * self.prod_sold + cost_recycling *
+                 self.prod_recycled + cost_landfilling *
+                 self.prod_landfilled + cost_hoarding *
+                 self.prod_hoarded) / self.count_consumers
+            self.refurbisher_costs_w_margins += \
+                (revenue * self.prod_sold * self.refurbisher_margin +
+                 cost_recycling * self.prod_recycled + cost_landfilling *
+                 self.prod_landfilled + cost_hoarding *
+                 self.prod_hoarded) / self.count_consumers
 
     def update_price_scdhand(self):
         self.scd_hand_price = self.scndhand_mkt_pric_rate * \
@@ -449,6 +430,5 @@ class Refurbishers(Agent):
         self.storage_to_other_pathway()
         self.product_from_recycler()
         self.storage_to_other_pathway_recycler()
-        self.recovered_material_volumes()
         self.compute_refurbisher_costs()
         self.update_price_scdhand()
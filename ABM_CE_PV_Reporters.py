@@ -0,0 +1,194 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - reporters
+"""
+
+import numpy as np
+
+
+class ModelReports:
+    """
+    Compute every model-level output of ABM_CE_PV.report_output and
+    ABM_CE_PV.count_EoL in a single pass over agents (or from the
+    ConsumerStore with the vectorized engine). Values are cached until the
+    model steps, so that the model's reporters only read them.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        outputs (dictionary of report_output conditions and values)
+        eol_counts (dictionary of count_EoL conditions and values)
+        sold_repaired (volume of products sold and repaired by consumers)
+
+    """
+
+    consumer_outputs = {
+        "product_repaired": "number_product_repaired",
+        "product_sold": "number_product_sold",
+        "product_recycled": "number_product_recycled",
+        "product_landfilled": "number_product_landfilled",
+        "product_hoarded": "number_product_hoarded",
+        "product_new_repaired": "number_new_prod_repaired",
+        "product_new_sold": "number_new_prod_sold",
+        "product_new_recycled": "number_new_prod_recycled",
+        "product_new_landfilled": "number_new_prod_landfilled",
+        "product_new_hoarded": "number_new_prod_hoarded",
+        "product_used_repaired": "number_used_prod_repaired",
+        "product_used_sold": "number_used_prod_sold",
+        "product_used_recycled": "number_used_prod_recycled",
+        "product_used_landfilled": "number_used_prod_landfilled",
+        "product_used_hoarded": "number_used_prod_hoarded",
+        "consumer_costs": "consumer_costs",
+        "prod_stock_new_mass": "new_products_mass",
+        "prod_stock_used_mass": "used_products_mass"}
+    consumer_stocks = {
+        "product_stock": "number_product_hard_copy",
+        "product_stock_new": "new_products_hard_copy",
+        "product_stock_used": "used_products_hard_copy"}
+    eol_conditions = {
+        "repairing": ("EoL_pathway", "repair"),
+        "selling": ("EoL_pathway", "sell"),
+        "recycling": ("EoL_pathway", "recycle"),
+        "landfilling": ("EoL_pathway", "landfill"),
+        "hoarding": ("EoL_pathway", "hoard"),
+        "buy_new": ("purchase_choice", "new"),
+        "buy_used": ("purchase_choice", "used"),
+        "buy_certified": ("purchase_choice", "certified")}
+
+    def __init__(self, model):
+        """
+        Creation of the model's reports
+        """
+        self.model = model
+        self.outputs = {}
+        self.eol_counts = {}
+        self.sold_repaired = 0
+        self.key = None
+
+    def get_output(self, condition):
+        """
+        Return a waste stream (see ABM_CE_PV.report_output).
+        """
+        self.refresh()
+        return self.outputs.get(condition, 0)
+
+    def get_eol_count(self, condition):
+        """
+        Return the number of consumers in an end of life pathway or purchase
+        choice (see ABM_CE_PV.count_EoL).
+        """
+        self.refresh()
+        return self.eol_counts.get(condition, 0)
+
+    def refresh(self):
+        """
+        Update reports if the model stepped since they were computed.
+        """
+        if self.key != (self.model.schedule.steps, self.model.clock):
+            self.update()
+
+    def update(self):
+        """
+        Compute all reports.
+        """
+        model = self.model
+        self.key = (model.schedule.steps, model.clock)
+        outputs = dict.fromkeys(
+            list(self.consumer_outputs) + list(self.consumer_stocks) +
+            ["average_landfill_cost", "average_hoarding_cost",
+             "average_recycling_cost", "average_repairing_cost",
+             "average_second_hand_price", "recycled_mat_volume",
+             "recycled_mat_value", "producer_costs", "recycler_costs",
+             "refurbisher_costs", "refurbisher_costs_w_margins"], 0)
+        eol_counts = dict.fromkeys(self.eol_conditions, 0)
+        consumers = model.consumers
+        producers = model.producers
+        recyclers = model.recyclers
+        refurbishers = model.refurbishers
+        industrial_waste = 0
+        industrial_waste_mass = 0
+        for agent in producers:
+            industrial_waste += \
+                agent.industrial_waste_generated / model.num_consumers
+            industrial_waste_mass += \
+                model.yearly_product_wght * \
+                agent.industrial_waste_generated / model.num_consumers
+            if not np.isnan(agent.recycled_material_volume):
+                outputs["recycled_mat_volume"] += \
+                    agent.recycled_material_volume
+            if not np.isnan(agent.recycled_material_value):
+                outputs["recycled_mat_value"] += agent.recycled_material_value
+            outputs["producer_costs"] += agent.producer_costs
+        if model.epr_business_model:
+            industrial_waste_streams = {
+                "product_recycled": industrial_waste,
+                "product_new_recycled": industrial_waste_mass}
+        else:
+            industrial_waste_streams = {
+                "product_landfilled": industrial_waste,
+                "product_new_landfilled": industrial_waste_mass}
+        self.sold_repaired = 0
+        if model.engine == "vectorized":
+            self.update_consumers_from_store(outputs, eol_counts,
+                                             industrial_waste_streams)
+        else:
+            for agent in consumers:
+                for condition, name in self.consumer_stocks.items():
+                    outputs[condition] += sum(getattr(agent, name))
+                for condition, name in self.consumer_outputs.items():
+                    outputs[condition] += getattr(agent, name)
+                    if condition in industrial_waste_streams:
+                        outputs[condition] += \
+                            industrial_waste_streams[condition]
+                self.sold_repaired += agent.number_product_sold
+                self.sold_repaired += agent.number_product_repaired
+                outputs["average_landfill_cost"] += \
+                    agent.landfill_cost / model.num_consumers
+                outputs["average_hoarding_cost"] += \
+                    agent.hoarding_cost / model.num_consumers
+                for condition, (decision, choice) in \
+                        self.eol_conditions.items():
+                    if getattr(agent, decision) == choice:
+                        eol_counts[condition] += 1
+        for agent in recyclers:
+            outputs["average_recycling_cost"] += \
+                agent.recycling_cost / model.num_recyclers
+            outputs["recycler_costs"] += agent.recycler_costs
+        for agent in refurbishers:
+            outputs["average_repairing_cost"] += \
+                agent.repairing_cost / model.num_refurbishers
+            outputs["average_second_hand_price"] += \
+                (-1 * agent.scd_hand_price) / model.num_refurbishers
+            outputs["refurbisher_costs"] += agent.refurbisher_costs
+            outputs["refurbisher_costs_w_margins"] += \
+                agent.refurbisher_costs_w_margins
+        if model.schedule.agents:
+            outputs["year"] = 2020 + model.clock
+            outputs["weight"] = model.dynamic_product_average_wght
+        self.outputs = outputs
+        self.eol_counts = eol_counts
+
+    def update_consumers_from_store(self, outputs, eol_counts,
+                                    industrial_waste_streams):
+        """
+        Compute consumers' reports from the ConsumerStore arrays.
+        """
+        model = self.model
+        store = model.consumer_store
+        num_cohorts = store.num_cohorts
+        for condition, name in self.consumer_stocks.items():
+            outputs[condition] = getattr(store, name)[:, :num_cohorts].sum()
+        for condition, name in self.consumer_outputs.items():
+            outputs[condition] = getattr(store, name).sum()
+        for condition, value in industrial_waste_streams.items():
+            outputs[condition] += value * model.num_consumers
+        self.sold_repaired = store.number_product_sold.sum() + \
+            store.number_product_repaired.sum()
+        outputs["average_landfill_cost"] = store.landfill_cost.mean()
+        outputs["average_hoarding_cost"] = store.hoarding_cost.mean()
+        for condition, (decision, choice) in self.eol_conditions.items():
+            choices = getattr(store, store.categoricals[decision])
+            if choice in choices:
+                eol_counts[condition] = int(np.sum(
+                    getattr(store, decision) == choices.index(choice)))
@@ -0,0 +1,166 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Run - cache of simulation outputs keyed by the model's parameters
+"""
+
+from ABM_CE_PV_StateDistances import file_digest
+from functools import partial
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import mesa
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy
+
+
+# Scripts running the model, which do not change simulations' outputs
+RUN_SCRIPTS = ["ABM_CE_PV_BatchRun.py", "ABM_CE_PV_MultipleRun.py",
+               "ABM_CE_PV_CampaignRunner.py", "ABM_CE_PV_RunCache.py"]
+
+
+_code_versions = {}
+
+
+def code_version(directory=None):
+    """
+    Return the hash of the model's code (all ABM_CE_PV modules except the
+    run scripts), of the states adjacency matrix (read by the model from the
+    working directory) and of the versions of the libraries drawing random
+    numbers and running the model.
+    """
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(directory, "ABM_CE_PV_*.py")))
+    paths.append(os.path.abspath("StatesAdjacencyMatrix.csv"))
+    if tuple(paths) not in _code_versions:
+        digest = hashlib.sha256()
+        for path in paths:
+            if os.path.basename(path) not in RUN_SCRIPTS and \
+                    os.path.exists(path):
+                digest.update(os.path.basename(path).encode())
+                digest.update(file_digest(path).encode())
+        for library in [np, pd, nx, mesa, scipy]:
+            digest.update(("%s %s" % (library.__name__,
+                                      library.__version__)).encode())
+        _code_versions[tuple(paths)] = digest.hexdigest()
+    return _code_versions[tuple(paths)]
+
+
+def describe(value):
+    """
+    Return a JSON serializable description of values that are not (e.g.,
+    numpy values or reporters' functions).
+    """
+    if isinstance(value, partial):
+        return [describe(value.func), list(value.args), value.keywords]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if callable(value):
+        return "%s.%s" % (value.__module__, value.__qualname__)
+    return repr(value)
+
+
+class RunCache:
+    """
+    Outputs of simulations stored on disk, keyed by the hash of all the
+    model's parameters (including default values and the seed), the number
+    of steps, the outputs stored and the model's code version (see
+    code_version). Simulations with the same key give the same outputs, so
+    they are only run once across campaigns. Simulations without a seed
+    are not cached.
+
+    Attributes:
+        model_cls (class of the model, e.g., ABM_CE_PV)
+        directory (directory of the cached outputs), (default="RunCache").
+            Modeler's choice.
+        code_version (hash of the model's code, see code_version)
+
+    """
+
+    def __init__(self, model_cls, directory="RunCache"):
+        """
+        Creation of the run cache
+        """
+        self.model_cls = model_cls
+        self.directory = directory
+        self.code_version = code_version(os.path.dirname(os.path.abspath(
+            inspect.getfile(model_cls))))
+
+    def resolve(self, kwargs):
+        """
+        Return all the model's parameters, with default values for those
+        not in kwargs.
+        """
+        arguments = inspect.signature(self.model_cls).bind(**kwargs)
+        arguments.apply_defaults()
+        return arguments.arguments
+
+    def key(self, kwargs, max_steps, outputs="model_vars"):
+        """
+        Return the key of a simulation's outputs (e.g., "model_vars" for the
+        data collector's model variables, or a dictionary of reporters), or
+        None if the simulation has no seed.
+        """
+        parameters = self.resolve(kwargs)
+        if parameters.get("seed") is None:
+            return None
+        description = json.dumps(
+            [self.code_version, max_steps, outputs, parameters],
+            default=describe, sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def path(self, key):
+        """
+        Return the path of the file of a key's outputs.
+        """
+        return os.path.join(self.directory, key[:2], "%s.pkl" % key)
+
+    def get(self, key):
+        """
+        Return the outputs stored for a key, or None if there are none.
+        """
+        if key is None:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key, outputs):
+        """
+        Store the outputs of a key.
+        """
+        if key is None:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            pickle.dump(outputs, f)
+        os.replace(tmp_path, path)
+
+    def run_model(self, kwargs, max_steps):
+        """
+        Return the data collector's model variables of a simulation, from
+        the cache or by running the model (the model is also returned, None
+        if outputs come from the cache).
+        """
+        key = self.key(kwargs, max_steps)
+        results_model = self.get(key)
+        if results_model is not None:
+            return results_model, None
+        model = self.model_cls(**kwargs)
+        for i in range(max_steps):
+            model.step()
+        results_model = model.datacollector.get_model_vars_dataframe()
+        self.put(key, results_model)
+        return results_model, model
@@ -0,0 +1,124 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Run - scenarios branching from a common prefix of simulation
+"""
+
+from multiprocessing import Pool
+
+
+# Model class and snapshot of the common prefix of the worker process's
+# scenario tree, set once when the worker starts (see init_worker)
+_tree = {}
+
+
+def init_worker(model_cls, snapshot):
+    """
+    Store the scenario tree's model class and snapshot in the worker
+    process.
+    """
+    _tree["model_cls"] = model_cls
+    _tree["snapshot"] = snapshot
+
+
+def run_branch(model_cls, snapshot, changes, max_steps):
+    """
+    Restore the model of a snapshot, change its attributes and run it until
+    reaching max steps.
+    """
+    model = model_cls.restore(snapshot)
+    for name, value in changes.items():
+        if not hasattr(model, name):
+            raise ValueError("Unknown model attribute: %s" % name)
+        setattr(model, name, value)
+    while model.running and model.schedule.steps < max_steps:
+        model.step()
+    return model
+
+
+def run_job(job):
+    """
+    Run one branch (name, changes and max steps) of the scenario tree in a
+    worker process and return its name and model variables.
+    """
+    name, changes, max_steps = job
+    model = run_branch(_tree["model_cls"], _tree["snapshot"], changes,
+                       max_steps)
+    return name, model.datacollector.get_model_vars_dataframe()
+
+
+class ScenarioTree:
+    """
+    Scenarios that only differ after some step (e.g., seeding starting at a
+    given year, or a lifetime seed switching at a given year). The common
+    prefix is simulated once, the model is then snapshotted (see
+    ABM_CE_PV.snapshot) and each branch restores the snapshot, changes the
+    model's attributes (e.g., {"seeding": {"Seeding": True, "Year": 10,
+    "number_seed": 50}}) and runs the remaining steps. Changes must be to
+    attributes read during steps (parameters only used when the model is
+    created, e.g., recycling_process, are not changed by a branch), and the
+    prefix must be the same for all branches (e.g., seeding starts after
+    the prefix). Branches restored from the snapshot also continue the
+    random number streams of the prefix, so a branch gives the same outputs
+    as a simulation of the whole scenario.
+    Branches can run in a pool of processes, which receive the snapshot
+    once (forked processes share it without copying).
+
+    Attributes:
+        model_cls (class of the model, e.g., ABM_CE_PV)
+        prefix_kwargs (dictionary of the model's parameters common to all
+            branches)
+        fork_step (number of steps of the common prefix)
+        snapshot (bytes, snapshot of the model at the end of the prefix,
+            None until the prefix is run)
+
+    """
+
+    def __init__(self, model_cls, prefix_kwargs, fork_step):
+        """
+        Creation of the scenario tree
+        """
+        self.model_cls = model_cls
+        self.prefix_kwargs = prefix_kwargs
+        self.fork_step = fork_step
+        self.snapshot = None
+
+    def run_prefix(self):
+        """
+        Run the common prefix and snapshot the model at its end.
+        """
+        model = self.model_cls(**self.prefix_kwargs)
+        while model.running and model.schedule.steps < self.fork_step:
+            model.step()
+        self.snapshot = model.snapshot()
+
+    def run_branch(self, changes, max_steps):
+        """
+        Run a branch (dictionary of model's attributes and their values in
+        the branch) until reaching max steps and return its model.
+        """
+        if self.snapshot is None:
+            self.run_prefix()
+        return run_branch(self.model_cls, self.snapshot, changes, max_steps)
+
+    def run_branches(self, branches, max_steps, nr_processes=1):
+        """
+        Run branches (dictionary of branches' names and changes) until
+        reaching max steps and return a dictionary of branches' names and
+        data collector's model variables.
+        """
+        if self.snapshot is None:
+            self.run_prefix()
+        jobs = [(name, changes, max_steps) for name, changes in
+                branches.items()]
+        if nr_processes > 1:
+            with Pool(nr_processes, initializer=init_worker,
+                      initargs=(self.model_cls, self.snapshot)) as pool:
+                return dict(pool.imap_unordered(run_job, jobs))
+        results = {}
+        for name, changes, max_steps in jobs:
+            model = run_branch(self.model_cls, self.snapshot, changes,
+                               max_steps)
+            results[name] = model.datacollector.get_model_vars_dataframe()
+        return results
@@ -0,0 +1,72 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - activation of agents by type
+"""
+
+from mesa.time import BaseScheduler
+
+
+class PhaseScheduler(BaseScheduler):
+    """
+    Scheduler activating agents one type after the other (phases), in the
+    order of agent_types, and agents of a type in the order they were added.
+    Agents of each type are kept in their own list so that agents and
+    reporters iterate only over the agents of the type they need. As agents
+    are created type by type in the order of their unique_id, agents are
+    activated in the same order as with BaseScheduler.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        agent_types (list of the names of agent types, in the order of the
+            phases)
+        agents_by_type (dictionary of agent types and lists of their agents)
+
+    """
+
+    def __init__(self, model, agent_types):
+        """
+        Creation of the scheduler
+        """
+        super().__init__(model)
+        self.agent_types = list(agent_types)
+        self.agents_by_type = {x: [] for x in self.agent_types}
+
+    def add(self, agent, agent_type):
+        """
+        Add an agent of a given type to the schedule.
+        """
+        super().add(agent)
+        self.agents_by_type[agent_type].append(agent)
+
+    def remove(self, agent):
+        """
+        Remove an agent from the schedule.
+        """
+        super().remove(agent)
+        for agents in self.agents_by_type.values():
+            if agent in agents:
+                agents.remove(agent)
+
+    def step_type(self, agent_type):
+        """
+        Execute the step of all the agents of a type, one at a time.
+        """
+        for agent in self.agents_by_type[agent_type]:
+            agent.step()
+
+    def step(self):
+        """
+        Execute the step of all the agents, one type after the other.
+        """
+        for agent_type in self.agent_types:
+            self.step_type(agent_type)
+        self.advance()
+
+    def advance(self):
+        """
+        Count a step once all phases are executed.
+        """
+        self.steps += 1
+        self.time += 1
@@ -0,0 +1,73 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - all-pairs shortest distances between states
+"""
+
+import hashlib
+import os
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+
+_loaded_distances = {}
+
+
+def file_digest(path):
+    """
+    Return the SHA-256 hash of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_state_distances(states, names):
+    """
+    Compute shortest paths between all pairs of states with the Dijkstra
+    algorithm.
+    """
+    states_graph = nx.relabel_nodes(nx.from_numpy_array(states),
+                                    dict(enumerate(names)))
+    distances = np.full((len(names), len(names)), np.inf)
+    index = {name: i for i, name in enumerate(names)}
+    for source, lengths in nx.all_pairs_dijkstra_path_length(
+            states_graph, weight='weight'):
+        for target, length in lengths.items():
+            distances[index[source], index[target]] = length
+    return distances
+
+
+def load_state_distances(path="StatesAdjacencyMatrix.csv"):
+    """
+    Return the states' names and their all-pairs shortest distance matrix
+    (in the order of the adjacency matrix columns). The matrix is stored next
+    to the adjacency matrix, keyed by the hash of its content, so that it is
+    only computed once.
+    """
+    digest = file_digest(path)
+    if digest not in _loaded_distances:
+        adjacency = pd.read_csv(path)
+        names = list(adjacency)
+        cache_path = os.path.join(
+            os.path.dirname(os.path.abspath(path)),
+            "%s_distances_%s.npy" %
+            (os.path.splitext(os.path.basename(path))[0], digest[:16]))
+        try:
+            distances = np.load(cache_path)
+        except (OSError, ValueError):
+            distances = compute_state_distances(adjacency.to_numpy(), names)
+            tmp_path = "%s.%d.tmp" % (cache_path, os.getpid())
+            try:
+                with open(tmp_path, "wb") as f:
+                    np.save(f, distances)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+        distances.setflags(write=False)
+        _loaded_distances[digest] = (names, distances)
+    return _loaded_distances[digest]
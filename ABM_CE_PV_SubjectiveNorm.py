@@ -0,0 +1,94 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - subjective norm of all consumers
+"""
+
+import numpy as np
+
+
+class SubjectiveNorm:
+    """
+    Proportion of each consumer's neighbors in each choice of a decision
+    (see Consumers.tpb_subjective_norm), for all consumers at once. Each
+    consumer's current choice (EoL_pathway or purchase_choice) is encoded as
+    a one-hot matrix (consumer x choice) and the proportions of all consumers
+    are the product of the row-normalized adjacency of the consumer network
+    with that matrix, computed once at the beginning of each step by the
+    model. If sequential, the number of neighbors in each choice is then
+    updated when a consumer changes choice so that each consumer sees the
+    choices made by the consumers stepped before it (as when neighbors are
+    looked up at each decision). Otherwise, all consumers see the choices of
+    the beginning of the step.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        sequential (boolean), (default=True). Modeler's choice.
+        choices (dictionary of decisions and lists of their choices, in the
+            order of the columns of the matrices)
+        adjacency (sparse adjacency matrix of the consumer network)
+        degree (array of the number of neighbors of each consumer)
+        counts (dictionary of decisions and arrays of the number of each
+            consumer's neighbors in each choice)
+
+    """
+
+    def __init__(self, model, sequential=True):
+        """
+        Creation of the subjective norm kernel
+        """
+        self.model = model
+        self.sequential = sequential
+        self.choices = {
+            "EoL_pathway": list(model.all_EoL_pathways.keys()),
+            "purchase_choice": list(model.purchase_options.keys())}
+        self.adjacency = model.neighbor_cache.adjacency(
+            0, model.num_consumers)
+        self.degree = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        self.counts = {}
+
+    def one_hot(self, decision):
+        """
+        Encode consumers' current choice of a decision as a one-hot matrix.
+        """
+        index = {x: i for i, x in enumerate(self.choices[decision])}
+        codes = np.array([index.get(getattr(agent, decision), -1) for agent
+                          in self.model.consumers])
+        one_hot = np.zeros((len(codes), len(index)))
+        chosen = codes >= 0
+        one_hot[np.nonzero(chosen)[0], codes[chosen]] = 1
+        return one_hot
+
+    def reset(self):
+        """
+        Count the neighbors of all consumers in each choice from the current
+        choices of consumers.
+        """
+        for decision in self.choices:
+            self.counts[decision] = self.adjacency @ self.one_hot(decision)
+
+    def change_choice(self, consumer, decision, past_choice):
+        """
+        Update the counts of a consumer's neighbors when it changes choice.
+        """
+        choice = getattr(consumer, decision)
+        if self.sequential and past_choice != choice:
+            choices = self.choices[decision]
+            neighbors = self.model.neighbor_cache.indices[
+                self.model.neighbor_cache.indptr[consumer.unique_id]:
+                self.model.neighbor_cache.indptr[consumer.unique_id + 1]]
+            counts = self.counts[decision]
+            if past_choice in choices:
+                counts[neighbors, choices.index(past_choice)] -= 1
+            if choice in choices:
+                counts[neighbors, choices.index(choice)] += 1
+
+    def proportions(self, consumer, decision):
+        """
+        Return the proportion of a consumer's neighbors in each choice.
+        """
+        degree = self.degree[consumer.unique_id]
+        if degree == 0:
+            return [0] * len(self.choices[decision])
+        return (self.counts[decision][consumer.unique_id] / degree).tolist()
@@ -0,0 +1,100 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Model - trust within the industrial symbiosis network
+"""
+
+import networkx as nx
+import numpy as np
+
+
+class TrustNetwork:
+    """
+    Trust of producers and recyclers in one another within the industrial
+    symbiosis (IS) network (see Producers.update_trust), computed with matrix
+    operations on the adjacency of the IS network. The trust of an agent i in
+    an agent j depends on the average trust of i in their common neighbors:
+    the sum of that trust over common neighbors is the product of row i of
+    the adjacency (weighted by the trust of i) with the adjacency, and the
+    number of common neighbors is the product of the adjacency with itself.
+    All trusts of an agent are updated from the trusts at the beginning of
+    its update (whereas the agents' loop reads the trusts of i already
+    updated in the loop).
+    The network also holds the trust history of all agents (the running
+    average of their trusts over steps). Each producer only reads its own
+    row, which is updated in place at the end of its trust update.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        adjacency (array of the adjacency of the IS network, rows and columns
+            in the order of model.trust_prod)
+        common_neighbors (array of the number of common neighbors of each
+            pair of agents of the IS network)
+        trust_history (array of the average trust of row index into column
+            over steps)
+
+    """
+
+    def __init__(self, model):
+        """
+        Creation of the trust network from the model's graph
+        """
+        self.model = model
+        first_node = model.num_consumers
+        self.adjacency = nx.to_numpy_array(
+            model.G, nodelist=range(first_node,
+                                    first_node + model.num_prod_n_recyc),
+            weight=None)
+        np.fill_diagonal(self.adjacency, 0)
+        self.common_neighbors = self.adjacency @ self.adjacency
+        self.trust_history = np.copy(model.trust_prod)
+
+    def update(self, rows, social_influencability, random_social_event):
+        """
+        Update the trust of the agents in rows (rows of model.trust_prod)
+        into all agents of the IS network, from their trust history and
+        random social events (one row per updated agent).
+        """
+        trust = self.model.trust_prod
+        rows = np.asarray(rows)
+        trust_history = self.trust_history[rows]
+        neighbors_trust = (self.adjacency[rows] * trust[rows]) @ \
+            self.adjacency
+        num_neighbors = self.common_neighbors[rows]
+        # Slight modification from Ghali et al.: if no common contact
+        # there is no element for reputation
+        avg_trust_neighbors = np.where(
+            num_neighbors > 0, np.asarray(social_influencability)[:, None] *
+            (neighbors_trust / np.maximum(num_neighbors, 1) -
+             trust_history), 0)
+        trust[rows] = np.clip(
+            trust_history + avg_trust_neighbors + random_social_event, -1, 1)
+
+    def update_producers(self):
+        """
+        Update trust of all producers at once, with one random social event
+        per producer and agent of the IS network. With common random numbers,
+        each producer's social events are those of its own stream (see
+        Producers.draw_social_events), as in the other trust updates.
+        """
+        model = self.model
+        if model.random_streams.common_random_numbers:
+            random_social_event = np.array(
+                [agent.draw_social_events() for agent in model.producers])
+        else:
+            random_social_event = np.random.uniform(
+                model.social_event_boundaries[0],
+                model.social_event_boundaries[1],
+                (len(model.producers), model.num_prod_n_recyc))
+        self.update([agent.agent_i for agent in model.producers],
+                    [agent.social_influencability for agent in
+                     model.producers], random_social_event)
+
+    def update_history(self, rows):
+        """
+        Add the current trust of the agents in rows to their trust history.
+        """
+        clock = self.model.clock
+        self.trust_history[rows] = (self.trust_history[rows] * (clock + 1) +
+                                    self.model.trust_prod[rows]) / (clock + 2)
@@ -0,0 +1,563 @@
+# -*- coding:utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+Agent - Consumer (vectorized engine)
+"""
+
+import numpy as np
+from ABM_CE_PV_ConsumerAgents import Consumers
+
+
+class ConsumerStore:
+    """
+    Struct-of-arrays state of the whole consumer population, used when the
+    model is created with engine="vectorized". Each per-consumer attribute
+    that evolves during a simulation is a NumPy array indexed by the consumer
+    unique_id (1-D for scalars, 2-D consumer x cohort year for products and
+    waste). Every phase of Consumers.step is run as one batched operation.
+
+    Within a phase, each consumer sees the population as it was at the start
+    of that phase (e.g., the neighbors' EoL pathways used for the subjective
+    norm), whereas in the agent engine consumers stepped earlier in the same
+    step are already updated. Random numbers are drawn in bulk, so a given
+    seed does not reproduce the agent engine's results.
+
+    Attributes:
+        model (see ABM_CE_PV_Model)
+        num_consumers (number of rows of each array)
+        num_cohorts (number of cohort years currently stored, i.e., the length
+            of the number_product list of the agent engine)
+
+    """
+
+    scalars = (
+        "number_product_EoL", "number_used_product_EoL", "tot_prod_EoL",
+        "number_product_repaired", "number_product_sold",
+        "number_product_recycled", "number_product_landfilled",
+        "number_product_hoarded", "number_new_prod_repaired",
+        "number_new_prod_sold", "number_new_prod_recycled",
+        "number_new_prod_landfilled", "number_new_prod_hoarded",
+        "number_used_prod_repaired", "number_used_prod_sold",
+        "number_used_prod_recycled", "number_used_prod_landfilled",
+        "number_used_prod_hoarded", "product_storage_to_other",
+        "product_storage_to_other_ref", "number_product_new",
+        "number_product_used", "number_product_certified",
+        "new_products_mass", "used_products_mass", "landfill_cost",
+        "product_growth", "weighted_average_mass_watt", "consumer_costs",
+        "past_recycled_waste", "yearly_recycled_waste", "sold_waste",
+        "waste_mass", "waste_average_mass_watt", "used_waste_mass")
+    series = (
+        "number_product", "number_product_hard_copy", "new_products",
+        "new_products_hard_copy", "used_products", "used_products_hard_copy",
+        "waste", "used_waste")
+    categoricals = {"EoL_pathway": "eol_choices",
+                    "used_EoL_pathway": "eol_choices",
+                    "purchase_choice": "purchase_choices"}
+    rows = {"perceived_behavioral_control": "eol_choices",
+            "copy_perceived_behavioral_control": "eol_choices",
+            "pbc_reuse": "purchase_choices"}
+
+    def __init__(self, model, num_consumers):
+        """
+        Allocate arrays, consumer agents then write their initial state in
+        them.
+        """
+        self.model = model
+        self.num_consumers = num_consumers
+        self.num_cohorts = len(model.total_number_product)
+        self.capacity = self.num_cohorts + 32
+        self.eol_choices = list(model.all_EoL_pathways.keys())
+        self.purchase_choices = list(model.purchase_options.keys())
+        for name in self.scalars:
+            setattr(self, name, np.zeros(num_consumers))
+        for name in self.series:
+            setattr(self, name, np.zeros((num_consumers, self.capacity)))
+        for name in self.categoricals:
+            setattr(self, name, np.full(num_consumers, -1, dtype=int))
+        for name, choices in self.rows.items():
+            setattr(self, name, np.full(
+                (num_consumers, len(getattr(self, choices))), np.nan))
+        self.storage_count = np.zeros(num_consumers, dtype=int)
+        self.mass_conversion_coeffs = np.array([])
+        self.extend_mass_conversion_coeffs(self.capacity)
+
+    def get(self, name, i):
+        """
+        Read one consumer's attribute.
+        """
+        if name in self.categoricals:
+            code = getattr(self, name)[i]
+            if code < 0:
+                return None
+            return getattr(self, self.categoricals[name])[code]
+        if name in self.series:
+            return getattr(self, name)[i, :self.num_cohorts]
+        return getattr(self, name)[i]
+
+    def set(self, name, i, value):
+        """
+        Write one consumer's attribute.
+        """
+        if name in self.categoricals:
+            choices = getattr(self, self.categoricals[name])
+            getattr(self, name)[i] = -1 if value is None else \
+                choices.index(value)
+        elif name in self.series:
+            array = getattr(self, name)
+            array[i, :len(value)] = value
+            array[i, len(value):] = 0
+        else:
+            getattr(self, name)[i] = value
+
+    def freeze(self):
+        """
+        Gather attributes that are drawn once at the creation of consumers and
+        build the consumer network adjacency. Called after all consumer agents
+        have been created.
+        """
+        consumers = self.model.consumers
+        for name in ["failure_rate_alpha", "used_product_substitution_rate",
+                     "max_storage", "attitude_level", "attitude_level_reuse",
+                     "w_sn_eol", "w_pbc_eol", "w_a_eol", "w_sn_reuse",
+                     "w_pbc_reuse", "w_a_reuse", "init_landfill_cost",
+                     "hoarding_cost", "random_interstate_distance"]:
+            setattr(self, name, np.array(
+                [getattr(agent, name) for agent in consumers], dtype=float))
+        self.recycler_index = np.array(
+            [agent.recycling_facility_id for agent in consumers]) - \
+            self.model.num_consumers
+        self.refurbisher_index = np.array(
+            [agent.refurbisher_id for agent in consumers]) - \
+            self.model.num_consumers - self.model.num_prod_n_recyc
+        self.extended_tpb_values = np.array(
+            [agent.extended_tpb_values for agent in consumers], dtype=float)
+        self.attitude_values = {decision: np.array(
+            [agent.attitude_values[decision] for agent in consumers],
+            dtype=float) for decision in ["EoL_pathway", "purchase_choice"]}
+        self.adjacency = self.model.neighbor_cache.adjacency(
+            0, self.num_consumers)
+        self.degree = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        self.seeded_ids = np.array(self.model.list_consumer_id_seed)
+
+    def extend_mass_conversion_coeffs(self, length):
+        """
+        Extend the table of mass conversion coefficients (kg/fu) of each
+        cohort year (see Consumers.mass_per_function_model).
+        """
+        if length > len(self.mass_conversion_coeffs):
+            self.mass_conversion_coeffs = np.array(
+                self.model.extend_mass_conversion_coeffs(length))
+        return self.mass_conversion_coeffs[:length]
+
+    def reserve(self, num_cohorts):
+        """
+        Grow the cohort dimension of the series arrays if needed.
+        """
+        if num_cohorts <= self.capacity:
+            return
+        self.capacity = max(num_cohorts, 2 * self.capacity)
+        for name in self.series:
+            array = np.zeros((self.num_consumers, self.capacity))
+            array[:, :self.num_cohorts] = \
+                getattr(self, name)[:, :self.num_cohorts]
+            setattr(self, name, array)
+        self.extend_mass_conversion_coeffs(self.capacity)
+
+    def mass_per_function_model(self, product_as_function):
+        """
+        Row-wise version of Consumers.mass_per_function_model: return the mass
+        of each row and the corresponding weighted average mass per fu.
+        """
+        coeffs = self.mass_conversion_coeffs[:product_as_function.shape[1]]
+        mass_eol = product_as_function @ coeffs
+        weighted_mass = (product_as_function * coeffs) @ coeffs
+        weighted_average_mass_watt = np.divide(
+            weighted_mass, mass_eol, out=np.zeros_like(mass_eol),
+            where=mass_eol != 0)
+        return mass_eol, weighted_average_mass_watt
+
+    def failure_fractions(self, avg_lifetime, failure_rate):
+        """
+        Fraction of each cohort failing, from the Weibull function of
+        ABM_CE_PV.waste_generation. avg_lifetime and failure_rate are
+        broadcast against each other (consumer x cohort year). The newest
+        cohort has a negative age and is kept complex, as in the agent engine.
+        """
+        correction_year = len(self.model.total_number_product) - 1
+        ages = self.model.clock + correction_year - \
+            np.arange(self.num_cohorts)
+        base, failure_rate = np.broadcast_arrays(ages / avg_lifetime,
+                                                 failure_rate)
+        fractions = np.empty(base.shape)
+        positive = base >= 0
+        fractions[positive] = 1 - np.exp(
+            -(base[positive] ** failure_rate[positive]))
+        negative = ~positive
+        if negative.any():
+            fractions[negative] = (1 - np.exp(-(
+                base[negative].astype(complex) **
+                failure_rate[negative]))).real
+        return fractions
+
+    def subjective_norm(self, codes, num_choices, weight_sn):
+        """
+        Proportion of each consumer's neighbors in each choice.
+        """
+        one_hot = np.zeros((self.num_consumers, num_choices))
+        chosen = codes >= 0
+        one_hot[np.nonzero(chosen)[0], codes[chosen]] = 1
+        proportions = self.adjacency @ one_hot
+        proportions = np.divide(
+            proportions, self.degree[:, None], out=np.zeros_like(proportions),
+            where=self.degree[:, None] > 0)
+        return weight_sn[:, None] * proportions
+
+    def choose(self, behavioral_intentions, available, current):
+        """
+        Select the available choice with the highest behavioral intention,
+        breaking ties at random. Consumers without available choice keep their
+        current one.
+        """
+        available = available & ~np.isnan(behavioral_intentions)
+        values = np.where(available, behavioral_intentions, -np.inf)
+        best = values.max(axis=1, keepdims=True)
+        ties = available & (values == best)
+        keys = np.where(ties, self.model.random_streams.stream(
+            "tie_breaking").random(values.shape), -1)
+        return np.where(available.any(axis=1), keys.argmax(axis=1), current)
+
+    def update_product_stock(self):
+        """
+        Batched Consumers.update_product_stock.
+        """
+        model = self.model
+        t = self.num_cohorts
+        self.reserve(t + 1)
+        additional_capacity = \
+            self.number_product_hard_copy[:, :t].sum(axis=1) * \
+            self.product_growth
+        for name in ["number_product_hard_copy", "number_product",
+                     "new_products", "new_products_hard_copy"]:
+            getattr(self, name)[:, t] = additional_capacity
+        self.used_products[:, t] = 0
+        self.used_products_hard_copy[:, t] = 0
+        used = np.nonzero(self.purchase_choice ==
+                          self.purchase_choices.index("used"))[0]
+        if used.size:
+            # Each buyer of used products takes the same share of what
+            # remains of the sold and repaired waste
+            share = (1 - model.imperfect_substitution) / \
+                model.consumer_used_product
+            remaining = model.sold_repaired_waste * \
+                (1 - share) ** np.arange(used.size)
+            product_substituted = share * remaining
+            self.used_products[used, t] = product_substituted
+            self.used_products_hard_copy[used, t] = product_substituted
+            new_products = np.where(
+                self.new_products[used, t] > product_substituted,
+                self.new_products[used, t] - product_substituted, 0)
+            self.new_products[used, t] = new_products
+            self.new_products_hard_copy[used, t] = new_products
+            model.sold_repaired_waste -= product_substituted.sum()
+        self.num_cohorts = t = t + 1
+        lifetimes = np.array(model.d_product_lifetimes[:t], dtype=float)
+        self.waste[:, :t] = self.new_products[:, :t] * \
+            self.failure_fractions(lifetimes[None, :],
+                                   self.failure_rate_alpha[:, None])
+        self.used_waste[:, :t] = self.used_products[:, :t] * \
+            self.failure_fractions(
+                lifetimes[None, :] *
+                self.used_product_substitution_rate[:, None],
+                model.avg_failure_rate[0])
+        self.waste_mass, self.waste_average_mass_watt = \
+            self.mass_per_function_model(self.waste[:, :t])
+        self.used_waste_mass, self.weighted_average_mass_watt = \
+            self.mass_per_function_model(self.used_waste[:, :t])
+        self.number_product_EoL = self.waste[:, :t].sum(axis=1)
+        self.number_used_product_EoL = self.used_waste[:, :t].sum(axis=1)
+        self.tot_prod_EoL = self.number_product_EoL + \
+            self.number_used_product_EoL
+        self.new_products[:, :t] -= self.waste[:, :t]
+        self.used_products[:, :t] -= self.used_waste[:, :t]
+        self.number_product[:, :t] -= self.waste[:, :t] + \
+            self.used_waste[:, :t]
+
+    def update_perceived_behavioral_control(self, refurbishers):
+        """
+        Batched Consumers.update_perceived_behavioral_control: gather costs
+        from each consumer's recycler and refurbisher.
+        """
+        model = self.model
+        recycling_cost = np.array([agent.recycling_cost for agent in
+                                   model.recyclers])
+        repairing_cost = np.array([agent.repairing_cost for agent in
+                                   refurbishers])
+        scd_hand_price = np.array([agent.scd_hand_price for agent in
+                                   refurbishers])
+        refurbisher_margin = np.array([agent.refurbisher_margin for agent in
+                                       refurbishers])
+        self.perceived_behavioral_control[:, 0] = \
+            repairing_cost[self.refurbisher_index]
+        self.perceived_behavioral_control[:, 1] = -1 * (
+            scd_hand_price * (1 - refurbisher_margin))[self.refurbisher_index]
+        self.perceived_behavioral_control[:, 2] = \
+            recycling_cost[self.recycler_index]
+        self.perceived_behavioral_control[:, 3] = self.landfill_cost
+        self.perceived_behavioral_control[:, 4] = self.hoarding_cost
+        self.pbc_reuse[:, 0] = model.fsthand_mkt_pric
+        self.pbc_reuse[:, 1] = scd_hand_price[self.refurbisher_index]
+        self.copy_perceived_behavioral_control = \
+            self.perceived_behavioral_control.copy()
+        return repairing_cost, scd_hand_price
+
+    def volume_used_products_purchased(self, repairing_cost, scd_hand_price):
+        """
+        Batched Consumers.volume_used_products_purchased.
+        """
+        model = self.model
+        choices = self.purchase_choices
+        sn_values = self.subjective_norm(
+            self.purchase_choice, len(choices), self.w_sn_reuse)
+        pbc_choice = self.pbc_reuse / np.abs(self.pbc_reuse).max(
+            axis=1, keepdims=True)
+        pbc_values = self.w_pbc_reuse[:, None] * -1 * np.maximum(
+            pbc_choice, 0)
+        a_values = self.attitude_values["purchase_choice"]
+        available = np.array([bool(model.purchase_options.get(x)) for x in
+                              choices])
+        self.purchase_choice = self.choose(
+            pbc_values + sn_values + a_values,
+            np.broadcast_to(available, sn_values.shape),
+            self.purchase_choice)
+        if model.seeding["Seeding"] and model.clock >= \
+                model.seeding["Year"]:
+            seeded = self.seeded_ids[:model.seeding["number_seed"]]
+            self.purchase_choice[seeded] = choices.index("used")
+            model.cost_seeding += np.sum(
+                scd_hand_price[self.refurbisher_index[seeded]] +
+                repairing_cost[self.refurbisher_index[seeded]] +
+                self.random_interstate_distance[seeded] *
+                model.transportation_cost / 1E3 *
+                model.dynamic_product_average_wght)
+        last_cohort = self.number_product[:, self.num_cohorts - 1]
+        new = self.purchase_choice == choices.index("new")
+        self.number_product_new += np.where(new, last_cohort, 0)
+        self.number_product_certified += np.where(new, 0, last_cohort)
+
+    def storage_management(self, limited_paths):
+        """
+        Batched Consumers.storage_management. The years of storage are tracked
+        with a counter of consecutive years in the "hoard" pathway.
+        """
+        eol_hoard = self.EoL_pathway == self.eol_choices.index("hoard")
+        new = self.purchase_choice == self.purchase_choices.index("new")
+        used = self.purchase_choice == self.purchase_choices.index("used")
+        hoard = (new & eol_hoard) | used
+        self.storage_count = np.where(
+            hoard, self.storage_count + 1,
+            np.where(new, 0, self.storage_count))
+        overflow = self.storage_count > self.max_storage
+        self.storage_count[overflow] = 0
+        self.product_storage_to_other[overflow] = \
+            self.number_product_hoarded[overflow]
+        self.number_product_hoarded[overflow] = 0
+        self.number_used_prod_hoarded[overflow] = 0
+        self.number_new_prod_hoarded[overflow] = 0
+        limited_paths[overflow, self.eol_choices.index("hoard")] = False
+
+    def tpb_perceived_behavioral_control(self):
+        """
+        Batched Consumers.tpb_perceived_behavioral_control for the EoL
+        decision, including Consumers.repairable_modules.
+        """
+        model = self.model
+        pbc_choice = self.perceived_behavioral_control / np.abs(
+            self.perceived_behavioral_control).max(axis=1, keepdims=True)
+        total_waste = self.number_product_EoL.sum()
+        sold = self.EoL_pathway == self.eol_choices.index("sell")
+        self.sold_waste[:] = self.number_product_EoL[sold].sum()
+        total_volume_refurbished = \
+            model.consumer_aggregates.total_volume_refurbished
+        if self.sold_waste[0] + total_volume_refurbished > \
+                model.repairability * total_waste:
+            pbc_choice[:, 0] = 1
+            pbc_choice[:, 1] = 1
+        if model.extended_tpb["Extended tpb"]:
+            pbc_choice = self.extended_tpb_values + pbc_choice
+            pbc_choice /= np.abs(pbc_choice).max(axis=1, keepdims=True)
+        return self.w_pbc_eol[:, None] * -1 * np.maximum(pbc_choice, 0)
+
+    def tpb_eol_decision(self, limited_paths, current):
+        """
+        Batched Consumers.tpb_decision for the EoL decision.
+        """
+        choices = self.eol_choices
+        sn_values = self.subjective_norm(
+            self.EoL_pathway, len(choices), self.w_sn_eol)
+        pbc_values = self.tpb_perceived_behavioral_control()
+        a_values = self.attitude_values["EoL_pathway"]
+        new_installed_capacity = \
+            self.number_product[:, self.num_cohorts - 1].sum()
+        used_volume_purchased = self.model.consumer_used_product / \
+            self.num_consumers * new_installed_capacity
+        sell = choices.index("sell")
+        limited_paths[:, sell] &= self.sold_waste < used_volume_purchased
+        return self.choose(pbc_values + sn_values + a_values, limited_paths,
+                           current)
+
+    def update_eol_volumes(self, eol_pathway, managed_waste, product_type,
+                           storage):
+        """
+        Batched Consumers.update_eol_volumes.
+        """
+        prefix = "number_new_prod_" if product_type == "new" else \
+            "number_used_prod_"
+        mass_eol = self.waste_mass if product_type == "new" else \
+            self.used_waste_mass
+        suffixes = {"repair": "repaired", "sell": "sold",
+                    "recycle": "recycled", "landfill": "landfilled",
+                    "hoard": "hoarded"}
+        for k, path in enumerate(self.eol_choices):
+            chosen = eol_pathway == k
+            if not chosen.any():
+                continue
+            suffix = suffixes[path]
+            getattr(self, "number_product_" + suffix)[chosen] += \
+                managed_waste[chosen]
+            if path != "recycle" or not self.model.epr_business_model:
+                self.consumer_costs[chosen] += managed_waste[chosen] * \
+                    self.perceived_behavioral_control[chosen, k]
+            mass_volume = mass_eol[chosen]
+            if product_type == "new" and path != "hoard":
+                mass_volume = mass_volume + \
+                    self.waste_average_mass_watt[chosen] * storage[chosen]
+            getattr(self, prefix + suffix)[chosen] += mass_volume
+
+    def update_product_eol(self, product_type):
+        """
+        Batched Consumers.update_product_eol.
+        """
+        model = self.model
+        limited_paths = np.tile(
+            [bool(model.all_EoL_pathways.get(x)) for x in self.eol_choices],
+            (self.num_consumers, 1))
+        if model.seeding_recyc["Seeding"] and model.clock >= \
+                model.seeding_recyc["Year"]:
+            seeded = self.seeded_ids[:model.seeding_recyc["number_seed"]]
+            self.perceived_behavioral_control[seeded, 2] *= \
+                model.seeding_recyc["discount"]
+        if product_type == "new":
+            self.storage_management(limited_paths)
+            self.EoL_pathway = self.tpb_eol_decision(limited_paths,
+                                                     self.EoL_pathway)
+            self.update_eol_volumes(
+                self.EoL_pathway,
+                self.number_product_EoL + self.product_storage_to_other,
+                product_type, self.product_storage_to_other)
+        else:
+            for path in ["repair", "sell", "hoard"]:
+                limited_paths[:, self.eol_choices.index(path)] = False
+            self.used_EoL_pathway = self.tpb_eol_decision(
+                limited_paths, self.used_EoL_pathway)
+            self.update_eol_volumes(
+                self.used_EoL_pathway, self.number_used_product_EoL,
+                product_type, self.product_storage_to_other)
+
+    def product_mass_output_metrics(self):
+        """
+        Batched Consumers.product_mass_output_metrics.
+        """
+        last = self.num_cohorts - 1
+        coeff = self.mass_conversion_coeffs[last]
+        self.new_products_mass += self.new_products_hard_copy[:, last] * coeff
+        self.used_products_mass += \
+            self.used_products_hard_copy[:, last] * coeff
+        self.weighted_average_mass_watt = np.where(
+            self.used_products_hard_copy[:, last] != 0, coeff, 0.)
+
+    def step(self):
+        """
+        Evolution of all consumers at each step (same phases as
+        Consumers.step).
+        """
+        model = self.model
+        self.product_mass_output_metrics()
+        self.product_storage_to_other[:] = 0
+        self.product_storage_to_other_ref[:] = 0
+        self.landfill_cost = \
+            self.init_landfill_cost + \
+            (model.dynamic_product_average_wght -
+             model.product_average_wght) * \
+            model.transportation_cost / 1E3 * model.mean_distance_within_state
+        if model.clock > model.growth_threshold:
+            self.product_growth[:] = model.product_growth[1]
+        self.update_product_stock()
+        model.total_waste += self.tot_prod_EoL.sum()
+        model.total_yearly_new_products += \
+            self.new_products[:, self.num_cohorts - 1].sum()
+        repairing_cost, scd_hand_price = \
+            self.update_perceived_behavioral_control(model.refurbishers)
+        self.volume_used_products_purchased(repairing_cost, scd_hand_price)
+        self.update_product_eol("new")
+        self.product_storage_to_other_ref = \
+            self.product_storage_to_other.copy()
+        self.update_product_eol("used")
+
+
+def store_attribute(name):
+    """
+    Expose an array of the ConsumerStore as an attribute of consumer agents.
+    """
+    def getter(self):
+        return self.store.get(name, self.unique_id)
+
+    def setter(self, value):
+        self.store.set(name, self.unique_id, value)
+    return property(getter, setter)
+
+
+class VectorizedConsumers(Consumers):
+    """
+    A consumer agent whose evolving state lives in the model's ConsumerStore.
+    Attributes keep the names and meaning of the Consumers attributes so that
+    other agents and reporters are unaffected; product and waste lists are
+    NumPy arrays. The agent itself is not stepped: the model steps the whole
+    consumer population at once with ConsumerStore.step.
+
+    Attributes:
+        see Consumers
+
+    """
+
+    def __init__(self, unique_id, model, *args):
+        """
+        Creation of new consumer agent
+        """
+        self.store = model.consumer_store
+        super().__init__(unique_id, model, *args)
+        # Years of storage are counted by ConsumerStore.storage_count
+        del self.product_years_storage
+
+    def mass_per_function_model(self, product_as_function):
+        """
+        Convert end-of-life volume in Wp to kg (see
+        Consumers.mass_per_function_model).
+        """
+        product_as_function = np.asarray(product_as_function, dtype=float)
+        mass_eol, weighted_average_mass_watt = \
+            self.store.mass_per_function_model(product_as_function[None, :])
+        self.weighted_average_mass_watt = weighted_average_mass_watt[0]
+        return mass_eol[0]
+
+    def step(self):
+        """
+        Consumers are stepped all at once by the model (see
+        ConsumerStore.step).
+        """
+        pass
+
+
+for name in ConsumerStore.scalars + ConsumerStore.series + \
+        tuple(ConsumerStore.categoricals) + tuple(ConsumerStore.rows):
+    setattr(VectorizedConsumers, name, store_attribute(name))